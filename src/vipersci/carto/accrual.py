@@ -32,10 +32,13 @@ more.
 
 import argparse
 from collections import Counter
-from typing import Optional
+from typing import Optional, Tuple
 
 import geopandas as gp
-from shapely.geometry import box, LineString
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import LineString
 
 
 def arg_parser():
@@ -67,6 +70,9 @@ def main():
     # print(path)
 
     areas = gp.read_file(args.areas)
+    # There are typically far fewer categories than areas, and with a
+    # categorical dtype accumulate() can use their integer codes directly.
+    areas["category"] = areas["category"].astype("category")
 
     if df.crs != areas.crs:
         parser.error(
@@ -93,7 +99,10 @@ The area and path have different coordinate reference systems.
 
 
 def accumulate(
-    path: LineString, areas: gp.GeoDataFrame, counter: Optional[dict] = None
+    path: LineString,
+    areas: gp.GeoDataFrame,
+    counter: Optional[dict] = None,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
 ) -> Counter:
     """Returns a collections.Counter of floating point accumulations
     of the length of *Path* against each of the geometries in *areas*.
@@ -103,8 +112,20 @@ def accumulate(
     If a *counter* dict-like (which can be a collections.Counter object)
     is provided, returned accumulations will be added to those values
     provided in *counter*.
+
+    If *bounds* (minx, miny, maxx, maxy) are provided, they are taken to be the
+    total bounds of *areas*, otherwise they are computed from *areas*.  When
+    accumulating many paths against the same *areas*, computing the bounds
+    once with areas.total_bounds and providing them here avoids recomputing
+    them on each call.
     """
-    if not box(*areas.total_bounds).contains(path["geometry"]):
+    if bounds is None:
+        bounds = areas.total_bounds
+
+    # Since the bounding box is axis-aligned, the path is within it if the
+    # path's own bounds are, which is just four comparisons.
+    minx, miny, maxx, maxy = path.bounds
+    if minx < bounds[0] or miny < bounds[1] or maxx > bounds[2] or maxy > bounds[3]:
         raise ValueError(
             "The specified path geometry is not entirely contained within "
             "the area's bounding box."
@@ -115,7 +136,20 @@ def accumulate(
     else:
         counter = Counter(counter)
 
-    for area in areas.itertuples():
-        counter[area.category] += path.intersection(area.geometry).length
+    # The spatial index of *areas* (an STRtree that geopandas builds once and
+    # keeps) selects just those areas that the path intersects.  The selected
+    # areas are then intersected in a single call, rather than one call per
+    # area.
+    idx = areas.sindex.query(path, predicate="intersects")
+    lengths = shapely.length(shapely.intersection(path, areas.geometry.to_numpy()[idx]))
+
+    # Sum the lengths by integer category code, so that each category is
+    # only hashed once when it is added to the counter.  If the category column
+    # already has a categorical dtype, its codes are used as-is.
+    codes, categories = pd.factorize(areas["category"], use_na_sentinel=False)
+    totals = np.bincount(codes[idx], weights=lengths, minlength=len(categories))
+
+    for category, length in zip(categories, totals):
+        counter[category] += length
 
     return counter
@@ -29,12 +29,13 @@ from typing import Callable, Tuple
 
 import numpy as np
 from numpy.typing import NDArray
+from rasterio.coords import BoundingBox
 
 
 def compute_bounds(
     x_arr: NDArray,
     y_arr: NDArray,
-) -> Tuple[float, float, float, float]:
+) -> BoundingBox:
     """Compute cartesian bounds of input coordinates
 
     Args:
@@ -42,9 +43,29 @@ def compute_bounds(
         y_arr: set of y locations
 
     Returns:
-        a tuple (left, bottom, right, top) describing the bounds of the input data
+        a BoundingBox named tuple (left, bottom, right, top) describing the bounds
+        of the input data
     """
-    return (np.amin(x_arr), np.amin(y_arr), np.amax(x_arr), np.amax(y_arr))
+    return BoundingBox(np.min(x_arr), np.min(y_arr), np.max(x_arr), np.max(y_arr))
+
+
+def _grid_snap(
+    operator: Callable[[float], float],
+    value: float,
+    ground_sample_distance: float,
+) -> float:
+    """Round value to closest multiple of ground_sample_distance.
+
+    Args:
+        operator: Function that defines how value is rounded.  Usually math.floor
+          or math.ceil.
+        value: value to snap to grid
+        ground_sample_distance: defines a grid with origin 0 and cells of this size.
+
+    Returns:
+        Rounded value
+    """
+    return operator(value / ground_sample_distance) * ground_sample_distance
 
 
 def pad_grid_align_bounds(
@@ -70,25 +91,6 @@ def pad_grid_align_bounds(
     Returns:
         a tuple (left, bottom, right, top) describing padded and aligned bounds
     """
-
-    def _grid_snap(
-        operator: Callable[[float], float],
-        value: float,
-        ground_sample_distance: float,
-    ) -> float:
-        """Round value to closest multiple of ground_sample_distance.
-
-        Args:
-            operator: Function that defines how value is rounded.  Usually math.floor
-              or math.ceil.
-            value: value to snap to grid
-            ground_sample_distance: defines a grid with origin 0 and cells of this size.
-
-        Returns:
-            Rounded value
-        """
-        return operator(value / ground_sample_distance) * ground_sample_distance
-
     # Convert from pixels of padding to a buffer in x/y distance units.
     buffer = padding * ground_sample_distance
     # Make sure that bounds are snapped into a grid centered on the
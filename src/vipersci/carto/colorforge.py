@@ -27,7 +27,6 @@
 
 import argparse
 import logging
-from io import StringIO
 from pathlib import Path
 from typing import Sequence, Union
 
@@ -108,6 +107,115 @@ presets = dict(
 )
 
 
+# The VERVE stoplight colors as R, G, B values, in order from 0 to 100.
+_VERVE_STOPLIGHT = np.array(
+    [
+        [139, 219, 135],  # 0
+        [139, 219, 135],  # 1
+        [139, 219, 135],  # 2
+        [139, 220, 134],  # 3
+        [140, 220, 133],  # 4
+        [141, 220, 132],  # 5
+        [141, 220, 130],  # 6
+        [142, 220, 130],  # 7
+        [143, 221, 128],  # 8
+        [143, 221, 127],  # 9
+        [144, 221, 126],  # 10
+        [146, 222, 125],  # 11
+        [146, 222, 124],  # 12
+        [148, 222, 123],  # 13
+        [149, 223, 121],  # 14
+        [150, 224, 121],  # 15
+        [152, 224, 119],  # 16
+        [153, 224, 118],  # 17
+        [154, 224, 117],  # 18
+        [156, 225, 116],  # 19
+        [157, 225, 114],  # 20
+        [159, 226, 113],  # 21
+        [160, 225, 112],  # 22
+        [162, 226, 110],  # 23
+        [164, 227, 109],  # 24
+        [166, 227, 108],  # 25
+        [168, 228, 107],  # 26
+        [169, 228, 106],  # 27
+        [172, 228, 105],  # 28
+        [174, 229, 103],  # 29
+        [176, 229, 102],  # 30
+        [178, 229, 100],  # 31
+        [180, 230, 99],  # 32
+        [183, 230, 98],  # 33
+        [185, 231, 96],  # 34
+        [187, 231, 96],  # 35
+        [190, 231, 95],  # 36
+        [193, 231, 93],  # 37
+        [195, 232, 92],  # 38
+        [198, 232, 90],  # 39
+        [201, 233, 89],  # 40
+        [203, 233, 87],  # 41
+        [207, 233, 87],  # 42
+        [209, 234, 85],  # 43
+        [213, 234, 83],  # 44
+        [215, 234, 82],  # 45
+        [218, 234, 81],  # 46
+        [222, 234, 80],  # 47
+        [225, 236, 79],  # 48
+        [229, 235, 77],  # 49
+        [231, 236, 76],  # 50
+        [235, 236, 75],  # 51
+        [236, 235, 73],  # 52
+        [237, 232, 72],  # 53
+        [237, 228, 70],  # 54
+        [238, 226, 68],  # 55
+        [239, 223, 68],  # 56
+        [238, 220, 67],  # 57
+        [239, 216, 64],  # 58
+        [239, 213, 63],  # 59
+        [240, 209, 62],  # 60
+        [240, 206, 60],  # 61
+        [241, 203, 59],  # 62
+        [241, 199, 58],  # 63
+        [241, 195, 56],  # 64
+        [242, 192, 55],  # 65
+        [242, 188, 53],  # 66
+        [242, 183, 52],  # 67
+        [242, 180, 51],  # 68
+        [243, 176, 49],  # 69
+        [243, 171, 47],  # 70
+        [244, 167, 46],  # 71
+        [244, 163, 45],  # 72
+        [244, 159, 43],  # 73
+        [245, 154, 42],  # 74
+        [245, 150, 40],  # 75
+        [245, 145, 39],  # 76
+        [246, 141, 37],  # 77
+        [246, 136, 35],  # 78
+        [246, 132, 34],  # 79
+        [247, 126, 33],  # 80
+        [247, 122, 32],  # 81
+        [247, 117, 30],  # 82
+        [248, 112, 29],  # 83
+        [249, 106, 27],  # 84
+        [249, 102, 25],  # 85
+        [249, 96, 24],  # 86
+        [249, 90, 22],  # 87
+        [249, 86, 21],  # 88
+        [250, 80, 20],  # 89
+        [250, 74, 18],  # 90
+        [251, 69, 16],  # 91
+        [251, 63, 15],  # 92
+        [252, 57, 13],  # 93
+        [252, 51, 12],  # 94
+        [252, 45, 10],  # 95
+        [252, 39, 9],  # 96
+        [253, 33, 7],  # 97
+        [253, 27, 5],  # 98
+        [253, 20, 4],  # 99
+        [254, 14, 2],  # 100
+    ],
+    dtype=np.uint8,
+)
+
+
 class Palette:
     """
     This class maintains information about a specific instance of a color map for a
@@ -127,8 +235,11 @@ class Palette:
         over_color=0.999999,
     ):
         self.nodata_color = mpl.colors.to_rgba(nodata_color)
+        # The under, over, and extend settings below modify the colormap, so
+        # work on a copy rather than on a Colormap that the caller passed in.
+        # The colormaps registry already returns a copy.
         if isinstance(cmap, mpl.colors.Colormap):
-            self.cmap = cmap
+            self.cmap = cmap.copy()
         else:
             self.cmap = mpl.colormaps[cmap]
 
@@ -155,10 +266,80 @@ class Palette:
         self.bounded = bounded
         if bounded:
             self.norm = mpl.colors.BoundaryNorm(bounded, self.cmap.N, extend=extend)
+            # Every value in the same interval of *bounded* (including those
+            # under and over it) gets the same color, so they can be looked
+            # up once, here, with one representative value for each interval.
+            self._lut = self.cmap(
+                self.norm(np.insert(np.asarray(bounded, dtype=float), 0, -np.inf)),
+                bytes=True,
+            )
         else:
             self.norm = mpl.colors.Normalize(vmin=vmin, vmax=vmax)
 
+        self._gdal_colormaps = dict()
+
+    @classmethod
+    def from_preset(cls, name: str):
+        """
+        Returns a new Palette built from the entry in *presets* named by *name*.
+        """
+        kwargs = dict(presets[name])
+        if name in ("verve_slope", "verve_slope_discrete"):
+            kwargs["cmap"] = verve_stoplight()
+
+        return cls(**kwargs)
+
+    def apply(self, arr) -> np.ndarray:
+        """
+        Returns a uint8 numpy array of RGBA values with an additional final
+        dimension of length four, which are the colors of the values in *arr*.
+
+        This gives the same result as self.cmap(self.norm(arr), bytes=True), with
+        NaN values treated as masked (as plt.imshow() does), but if this Palette
+        is bounded, the colors are looked up from a table computed when the
+        Palette was created.
+        """
+        if not self.bounded:
+            return self.cmap(self.norm(arr), bytes=True)
+
+        data = np.ma.getdata(arr)
+        rgba = self._lut[np.digitize(data, self.bounded)]
+        bad = np.ma.getmaskarray(arr) | np.isnan(data)
+        if bad.any():
+            rgba[bad] = self.cmap(np.nan, bytes=True)
+
+        return rgba
+
     def to_gdal_colormap(self, epsilon=0.001):
+        """
+        Returns the text of a GDAL color table for this Palette, suitable for
+        gdaldem color-relief.
+
+        The text is cached, keyed by *epsilon* and by the attributes of this
+        Palette that it depends on, including the colormap's name and its
+        under, over, and bad colors, and the identity of the norm, so that
+        repeated calls are cheap.
+        """
+        key = (
+            epsilon,
+            self.label,
+            self.vmin,
+            self.vmax,
+            tuple(self.bounded) if self.bounded else None,
+            self.cmap.name,
+            self.cmap.colorbar_extend,
+            tuple(self.cmap.get_under()),
+            tuple(self.cmap.get_over()),
+            tuple(self.cmap.get_bad()),
+            id(self.norm),
+            self.nodata_color,
+        )
+        if key not in self._gdal_colormaps:
+            self._gdal_colormaps[key] = self._gdal_colormap(epsilon)
+
+        return self._gdal_colormaps[key]
+
+    def _gdal_colormap(self, epsilon):
         s = [
             f"# Color table for {self.label}",
             f"# created by {__name__} version {__version__}",
@@ -187,9 +368,14 @@ class Palette:
             if self.cmap.colorbar_extend in ("min", "neither"):
                 values = np.append(values, self.vmax + epsilon)
 
-        for v in values:
-            rgba = self.cmap(self.norm(v), bytes=True)
-            s.append(f"{v} {' '.join(map(str, rgba))}")
+        # Look up all of the colors with a single call, rather than one call
+        # to the norm and colormap for each value.
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        colors = self.cmap(self.norm(np.asarray(values)), bytes=True)
+        s.extend(
+            f"{v} {r} {g} {b} {a}" for v, (r, g, b, a) in zip(values, colors.tolist())
+        )
 
         if not mpl.colors.same_color(self.nodata_color, (0, 0, 0, 0)):
             s.append(f"nv {' '.join(map(str, color_to_bytes(self.nodata_color)))}")
@@ -249,12 +435,7 @@ def main():
     util.set_logger(args.verbose)
 
     if args.preset:
-        if args.preset in ("verve_slope", "verve_slope_discrete"):
-            d = presets[args.preset]
-            d["cmap"] = verve_stoplight()
-            pal = Palette(**d)
-        else:
-            pal = Palette(**presets[args.preset])
+        pal = Palette.from_preset(args.preset)
     else:
         pal = Palette(
             cmap=mpl.colormaps[args.colormap],
@@ -280,8 +461,7 @@ def color_to_bytes(color_tuple):
     Returns tuple of values from 0 to 255, based on values in input tuple assumed
     to be in the range zero to one.
     """
-    converted = map(lambda x: int(x * 255), color_tuple)
-    return tuple(converted)
+    return tuple(int(x * 255) for x in color_tuple)
 
 
 def example_plot(palette: Palette, output=None):
@@ -292,13 +472,16 @@ def example_plot(palette: Palette, output=None):
     # make these smaller to increase the resolution
     dx = 0.05
     x = np.arange(-3.0, 3.0, dx)
-    x_grid, y_grid = np.meshgrid(x, x)
+    y = x[:, np.newaxis]
+    # This is (1 - x/2 + x**5 + y**3) * exp(-(x**2 + y**2)), but the x and y
+    # terms are evaluated on the 1-D axis and only combined on the 2-D grid
+    # by broadcasting, rather than evaluating every term over a meshgrid.
     z = rescale(
-        (1 - x_grid / 2 + x_grid**5 + y_grid**3) * np.exp(-(x_grid**2 + y_grid**2)),
+        ((1 - x / 2 + x**5) + y**3) * (np.exp(-(x**2)) * np.exp(-(y**2))),
         palette.vmin,
         palette.vmax,
     )
-    extent = np.min(x_grid), np.max(x_grid), np.min(y_grid), np.max(y_grid)
+    extent = np.min(x), np.max(x), np.min(y), np.max(y)
 
     checkerboard = np.add.outer(range(32), range(32)) % 2
     plt.imshow(
@@ -310,12 +493,15 @@ def example_plot(palette: Palette, output=None):
         extent=extent,
     )
 
-    # plt.imshow(data, cmap=pal.cmap, norm=pal.norm)
-    plt.imshow(
-        z, cmap=palette.cmap, norm=palette.norm, interpolation="bilinear", extent=extent
-    )
+    # The colors are computed as uint8 RGBA here, rather than having imshow()
+    # build a float64 RGBA array from z, the norm, and the colormap.
+    plt.imshow(palette.apply(z), interpolation="bilinear", extent=extent)
 
-    plt.colorbar(label=palette.label)
+    plt.colorbar(
+        mpl.cm.ScalarMappable(norm=palette.norm, cmap=palette.cmap),
+        ax=plt.gca(),
+        label=palette.label,
+    )
     plt.title(f"Colormap: {palette.cmap.name}")
     plt.tick_params(
         left=False, right=False, labelleft=False, labelbottom=False, bottom=False
@@ -364,127 +550,25 @@ def plot_colorbar(palette: Palette, orientation: str = "h", output=None):
 def rescale(arr, min, max, range_mult=0.1):
     """
     Returns numpy array of data based on array, but scaled to be range_mult smaller and
-    larger than min and max,
+    larger than min and max, as float32 values, which is enough precision for display.
     """
-    data = arr.astype("float64")
+    data = arr.astype(np.float32)
     minmax_range = max - min
     real_min = min - (minmax_range * range_mult)
     real_max = max + (minmax_range * range_mult)
-    return (
-        ((data - np.min(data)) / (np.max(data) - np.min(data))) * (real_max - real_min)
-    ) + real_min
+    data_min = np.min(data)
+    data_max = np.max(data)
+    data_range = data_max - data_min
+
+    # The operations are done in-place on the copy made above to avoid
+    # allocating a temporary array for each step.
+    data -= data_min
+    data /= data_range
+    data *= real_max - real_min
+    data += real_min
+    return data
 
 
 def verve_stoplight():
     """Returns VERVE stoplight colors as a matplotlib colormap object."""
-    color_arr = np.flipud(
-        np.loadtxt(
-            StringIO(
-                """100 254 14 2
-99 253 20 4
-98 253 27 5
-97 253 33 7
-96 252 39 9
-95 252 45 10
-94 252 51 12
-93 252 57 13
-92 251 63 15
-91 251 69 16
-90 250 74 18
-89 250 80 20
-88 249 86 21
-87 249 90 22
-86 249 96 24
-85 249 102 25
-84 249 106 27
-83 248 112 29
-82 247 117 30
-81 247 122 32
-80 247 126 33
-79 246 132 34
-78 246 136 35
-77 246 141 37
-76 245 145 39
-75 245 150 40
-74 245 154 42
-73 244 159 43
-72 244 163 45
-71 244 167 46
-70 243 171 47
-69 243 176 49
-68 242 180 51
-67 242 183 52
-66 242 188 53
-65 242 192 55
-64 241 195 56
-63 241 199 58
-62 241 203 59
-61 240 206 60
-60 240 209 62
-59 239 213 63
-58 239 216 64
-57 238 220 67
-56 239 223 68
-55 238 226 68
-54 237 228 70
-53 237 232 72
-52 236 235 73
-51 235 236 75
-50 231 236 76
-49 229 235 77
-48 225 236 79
-47 222 234 80
-46 218 234 81
-45 215 234 82
-44 213 234 83
-43 209 234 85
-42 207 233 87
-41 203 233 87
-40 201 233 89
-39 198 232 90
-38 195 232 92
-37 193 231 93
-36 190 231 95
-35 187 231 96
-34 185 231 96
-33 183 230 98
-32 180 230 99
-31 178 229 100
-30 176 229 102
-29 174 229 103
-28 172 228 105
-27 169 228 106
-26 168 228 107
-25 166 227 108
-24 164 227 109
-23 162 226 110
-22 160 225 112
-21 159 226 113
-20 157 225 114
-19 156 225 116
-18 154 224 117
-17 153 224 118
-16 152 224 119
-15 150 224 121
-14 149 223 121
-13 148 222 123
-12 146 222 124
-11 146 222 125
-10 144 221 126
-9 143 221 127
-8 143 221 128
-7 142 220 130
-6 141 220 130
-5 141 220 132
-4 140 220 133
-3 139 220 134
-2 139 219 135
-1 139 219 135
-0 139 219 135"""
-            ),
-            dtype=np.dtype(int),
-            usecols=(1, 2, 3),
-        )
-    )
-
-    return mpl.colors.ListedColormap(color_arr / 255, name="VERVE_stoplight")
+    return mpl.colors.ListedColormap(_VERVE_STOPLIGHT / 255, name="VERVE_stoplight")
@@ -29,9 +29,9 @@ buffered versions of the regions.
 import argparse
 
 import geopandas as gp
-from shapely.geometry import MultiPolygon, Polygon
+import numpy as np
+import shapely
 from shapely.geometry.collection import GeometryCollection
-from shapely.ops import unary_union
 
 
 def arg_parser():
@@ -72,30 +72,33 @@ def main():
         )
     elif args.buffer < 0:
         # Since we are shrinking the geometries, we must first put them
-        # together.
-        expanded = []
-        for cat in categories.index:
-            if cat == isr_order[0]:
-                # The first geometry doesn't combine
-                expanded.append(categories.loc[isr_order[0]]["geometry"])
-            else:
-                # The rest do:
-                i = isr_order.index(cat)
-                expanded.append(
-                    categories.loc[list(isr_order[0 : i + 1])]
-                    .dissolve()["geometry"]
-                    .iloc[0]
-                )
-
-        categories.set_geometry(expanded, inplace=True)
+        # together.  Each category is combined with all of the categories
+        # before it in isr_order, so the union is accumulated in one pass
+        # rather than dissolving every prefix from scratch.
+        expanded = dict()
+        union = None
+        for cat in isr_order:
+            geom = categories.loc[cat]["geometry"]
+            union = geom if union is None else shapely.union(union, geom)
+            expanded[cat] = union
+
+        categories.set_geometry(
+            [expanded[cat] for cat in categories.index], inplace=True
+        )
 
     buffered = categories.buffer(args.buffer)
 
     print("Buffering complete.")
 
-    for cutting in isr_order[:3]:  # The last geom won't reduce any others.
-        for geom in isr_order[isr_order.index(cutting) + 1 :]:
-            buffered.loc[geom] = buffered.loc[geom].difference(buffered.loc[cutting])
+    # Each geometry is cut out of all of the geometries after it in isr_order,
+    # which shapely.difference() can do for all of them at once.
+    order = buffered.index.get_indexer(isr_order)
+    geoms = buffered.to_numpy()
+    for i, cutting in enumerate(order[:-1]):  # The last won't reduce any others.
+        following = order[i + 1 :]
+        geoms[following] = shapely.difference(geoms[following], geoms[cutting])
+
+    buffered = gp.GeoSeries(geoms, index=buffered.index, crs=buffered.crs)
 
     # The differencing may have resulted in a GeometryCollection instead
     # of a clean MultiPolygon.
@@ -107,11 +110,16 @@ def main():
 
 
 def clean(geometry):
+    """
+    If *geometry* is a GeometryCollection, returns the union of only its
+    Polygon and MultiPolygon members, otherwise returns *geometry* unchanged.
+    """
     if isinstance(geometry, GeometryCollection):
-        polys = []
-        for geom in geometry:
-            if isinstance(geom, (Polygon, MultiPolygon)):
-                polys.append(geom)
-        return unary_union(polys)
+        parts = shapely.get_parts(geometry)
+        is_poly = np.isin(
+            shapely.get_type_id(parts),
+            (shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON),
+        )
+        return shapely.unary_union(parts[is_poly])
 
     return geometry
@@ -53,14 +53,8 @@ def main():
 
     print("Read in file.")
 
-    if (df.has_z).any():
-        df["geometry"] = df.apply(
-            lambda row: shapely.ops.transform(
-                lambda x, y, z=None: (x, y), row["geometry"]
-            ),
-            axis=1,
-            result_type="expand",
-        )
+    if shapely.has_z(df.geometry.values).any():
+        df["geometry"] = shapely.force_2d(df.geometry.values)
 
         print("Converted geometries to 2D.")
     # print(df)
@@ -74,11 +68,14 @@ def main():
         df["Depth (m)"].astype(float),
         (-1, 0, 0.5, 1, 10),
         labels=["Surficial", "Shallow", "Deep", "Dry"],
-    ).astype(str)
+    )
 
     print("Added categories.")
 
-    dissolved = df.dissolve(by="category")
+    # Dissolving by the categorical codes is faster than by strings.  Depths
+    # outside of the bins have no category, and are kept as their own group.
+    dissolved = df.dissolve(by="category", observed=True, dropna=False)
+    dissolved.index = dissolved.index.astype(str)
 
     print("Dissolved geometries.")
 
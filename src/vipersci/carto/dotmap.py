@@ -26,18 +26,20 @@ The dotmap module takes scalar values with 2D coordinates and creates a simple
 # top level of this library.
 
 import math
-from typing import Sequence, Tuple
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
 import rasterio
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 from rasterio.coords import BoundingBox
-from rasterio.features import rasterize
-from shapely.geometry import Point
 
 from vipersci.carto.bounds import compute_bounds, pad_grid_align_bounds
 from vipersci.carto.heatmap import as_ndarray
 
+# The approximate size of the temporary arrays that draw_circles() makes for
+# each chunk of points.
+_DRAW_CIRCLES_BYTES = 64 * 2**20
+
 
 def generate_dotmap(
     x_coords: Sequence,
@@ -47,7 +49,8 @@ def generate_dotmap(
     ground_sample_distance: float,
     padding: int = 0,
     nodata: float = -1,
-) -> Tuple[rasterio.Affine, NDArray[np.float32]]:
+    dtype: DTypeLike = np.float32,
+) -> Tuple[rasterio.Affine, NDArray]:
     """
     Creates a simple "dotmap" by drawing a filled circle with the
     provided value at each point.  Subsequent points will be drawn
@@ -63,34 +66,124 @@ def generate_dotmap(
             returning an array.  If None (the default), the value of *radius*
             converted to pixels will be used.
         nodata: the fill value to use where points are not present. Defaults to -1.
+        dtype: the data type of the output, which defaults to float32.  A smaller
+            type, like uint8 for class labels, reduces the memory used, but
+            *nodata* and all of the *values* must be representable in it.
     Returns:
         A tuple (transform, output)
         transform: transform used to georeference the output data
         output: the output data containing circles drawn at each point.
     """
 
+    x_arr = as_ndarray(x_coords, np.float64)
+    y_arr = as_ndarray(y_coords, np.float64)
+
     padding = padding + math.ceil(radius / ground_sample_distance)
     bounds = BoundingBox(
         *pad_grid_align_bounds(
-            *compute_bounds(as_ndarray(x_coords), as_ndarray(y_coords)),
-            ground_sample_distance,
-            padding
+            *compute_bounds(x_arr, y_arr), ground_sample_distance, padding
         )
     )
 
     transform = rasterio.transform.from_origin(
         bounds.left, bounds.top, ground_sample_distance, ground_sample_distance
     )
+    # The bounds are whole multiples of ground_sample_distance, so the shape
+    # is the difference of their integer grid positions.  Taking the floor of
+    # the float quotients would drop a row or column whenever the division
+    # comes out a hair under a whole number.
     out_shape = (
-        math.floor((bounds.top - bounds.bottom) / ground_sample_distance),
-        math.floor((bounds.right - bounds.left) / ground_sample_distance),
+        round(bounds.top / ground_sample_distance)
+        - round(bounds.bottom / ground_sample_distance),
+        round(bounds.right / ground_sample_distance)
+        - round(bounds.left / ground_sample_distance),
     )
 
-    shapes = []
-    for x, y, val in zip(x_coords, y_coords, values):
-        shapes.append((Point(x, y).buffer(radius), val))
-
-    output = rasterize(
-        shapes, out_shape=out_shape, fill=nodata, transform=transform, dtype=np.float32
+    output = np.full(out_shape, nodata, dtype=dtype)
+    draw_circles(
+        output,
+        bounds.left,
+        bounds.top,
+        ground_sample_distance,
+        x_arr,
+        y_arr,
+        as_ndarray(values),
+        radius,
     )
     return transform, output
+
+
+def draw_circles(
+    output: NDArray,
+    left: float,
+    top: float,
+    ground_sample_distance: float,
+    x_arr: NDArray,
+    y_arr: NDArray,
+    values: NDArray,
+    radius: float,
+    chunk_size: Optional[int] = None,
+):
+    """
+    Sets the pixels of *output* whose centers are within *radius* of each of
+    the points in *x_arr* and *y_arr* to the corresponding value in *values*.
+    Subsequent points overwrite any pixels that they share with earlier points.
+
+    Rather than building and rasterizing a polygon for each point, the pixel
+    centers in a square window around each point are tested against the
+    circle, and all of the pixels inside the circles are set with a single
+    assignment for each chunk of *chunk_size* points.
+
+    Parameters:
+        output: the 2D array to draw in.  Any parts of the circles that fall
+            outside of it are not drawn.
+        left: x coordinate of the left edge of *output*
+        top: y coordinate of the top edge of *output*
+        ground_sample_distance: Spatial resolution of *output*
+        x_arr: x coordinates of the data points
+        y_arr: y coordinates of the data points
+        values: values of the data points
+        radius: The radius of the circles to be drawn at each input point
+        chunk_size: number of points to draw at once, which bounds the size of
+            the temporary arrays.  If None (the default), it is as many points
+            as keep them to about 64 MB.
+    """
+    # Offsets of the pixels in a window that covers a circle of radius.
+    offsets = np.arange(
+        -math.ceil(radius / ground_sample_distance),
+        math.ceil(radius / ground_sample_distance) + 1,
+    )
+    radius_sq = radius * radius
+
+    if chunk_size is None:
+        # Each pixel of a point's window takes about 64 bytes: its squared
+        # distance, and the indexes of the pixels within *radius*, which are
+        # also sorted to find the last point to draw each one.
+        chunk_size = max(1, _DRAW_CIRCLES_BYTES // (offsets.size**2 * 64))
+
+    for start in range(0, len(values), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        x = x_arr[chunk, np.newaxis]
+        y = y_arr[chunk, np.newaxis]
+
+        # The rows and columns of each point's window, and the squared
+        # distances from each point to the centers of those rows and columns.
+        cols = np.floor((x - left) / ground_sample_distance).astype(np.intp) + offsets
+        rows = np.floor((top - y) / ground_sample_distance).astype(np.intp) + offsets
+        dx_sq = (left + (cols + 0.5) * ground_sample_distance - x) ** 2
+        dy_sq = (top - (rows + 0.5) * ground_sample_distance - y) ** 2
+        dx_sq[(cols < 0) | (cols >= output.shape[1])] = np.inf
+        dy_sq[(rows < 0) | (rows >= output.shape[0])] = np.inf
+
+        n, i, j = np.nonzero(
+            dy_sq[:, :, np.newaxis] + dx_sq[:, np.newaxis, :] < radius_sq
+        )
+        r = rows[n, i]
+        c = cols[n, j]
+
+        # The indices of the nonzero elements are in point order, but numpy
+        # doesn't guarantee which of the repeated indices in an assignment
+        # wins, so only the last point that covers each pixel is assigned.
+        _, last = np.unique((r * output.shape[1] + c)[::-1], return_index=True)
+        last = n.size - 1 - last
+        output[r[last], c[last]] = values[chunk][n[last]]
@@ -24,23 +24,30 @@
 # top level of this library.
 
 import argparse
-import csv
 import getpass
 import http.client as http_client
 import logging
 import sys
-from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 from vipersci import util
 
 logger = logging.getLogger(__name__)
 
+# The records of unix time, x-location, y-location, and yaw returned by the
+# get_position_and_pose functions.
+TPP_DTYPE = np.dtype([("t", "f8"), ("x", "f8"), ("y", "f8"), ("yaw", "f8")])
+
 
 def arg_parser():
     parser = argparse.ArgumentParser(
@@ -106,46 +113,84 @@ def main():
     t_start = datetime.fromisoformat(args.start)
     t_end = datetime.fromisoformat(args.end)
 
-    if args.frequency:
-        times = pd.date_range(t_start, t_end, freq=args.frequency).tolist()
+    with connect() as session:
+        if args.frequency:
+            times = pd.date_range(t_start, t_end, freq=args.frequency)
 
-        unix_times = []
-        for t in times:
-            unix_times.append(t.timestamp())
+            # Whole microseconds divide exactly into the same float seconds that
+            # Timestamp.timestamp() gives; nanoseconds would not.
+            unix_times = (times.asi8 // 1000 / 1e6).tolist()
 
-        tpp = get_position_and_pose(unix_times, args.url, auth=basic_auth)
-    else:
-        tpp = get_position_and_pose_range(
-            t_start.timestamp(), t_end.timestamp(), args.url, auth=basic_auth
-        )
+            tpp = get_position_and_pose(
+                unix_times, args.url, auth=basic_auth, session=session
+            )
+        else:
+            tpp = get_position_and_pose_range(
+                t_start.timestamp(),
+                t_end.timestamp(),
+                args.url,
+                auth=basic_auth,
+                session=session,
+            )
 
     if args.output is not None:
-        with open(args.output, "w", newline="") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["UTC datetime", "x", "y", "yaw"])
-            for row in tpp:
-                dt = datetime.fromtimestamp(row[0], tz=timezone.utc)
-                writer.writerow(
-                    [
-                        dt.isoformat(),
-                    ]
-                    + list(row[1:])
-                )
-
-
-def get_position_and_pose(times: list, url: str, crs: str = "VIPER:910101", auth=None):
+        write_csv(args.output, tpp)
+
+
+def connect(pool_size: int = 16) -> requests.Session:
     """
-    Given a list of unix times and a URL that requests can be made against,
-    return a list of two-tuples whose first element is the time and
-    whose second element is a three-tuple of x-location, y-location,
-    and yaw.
+    Returns a requests.Session whose connection pool keeps up to *pool_size*
+    connections to each host open, so that they can be reused by later and
+    concurrent requests.
     """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-    tpp = []
 
-    for t in times:
+def write_csv(path, tpp):
+    """
+    Writes the unix time, x-location, y-location, and yaw records in *tpp*,
+    a structured array with TPP_DTYPE or a sequence of four-tuples, to a CSV
+    file at *path*, with the times as ISO8601 UTC datetimes.
+    """
+    df = pd.DataFrame(tpp, columns=["t", "x", "y", "yaw"])
+
+    # Format all of the datetimes at once, in the same way that
+    # datetime.isoformat() would, which only shows microseconds when there
+    # are some.
+    dt = pd.to_datetime(df.pop("t"), unit="s", utc=True).dt.round("us")
+    frac = dt.dt.strftime(".%f").where(dt.dt.microsecond != 0, "")
+    df.insert(0, "UTC datetime", dt.dt.strftime("%Y-%m-%dT%H:%M:%S") + frac + "+00:00")
+
+    # The csv module's default line terminator.
+    df.to_csv(path, index=False, lineterminator="\r\n")
+
+
+def get_position_and_pose(
+    times: list,
+    url: str,
+    crs: str = "VIPER:910101",
+    auth=None,
+    max_workers: int = 16,
+    session: Optional[requests.Session] = None,
+):
+    """
+    Given a list of unix times and a URL that requests can be made against,
+    return a structured array with TPP_DTYPE of the time, x-location,
+    y-location, and yaw found for each of *times*, in the same order.
+
+    Up to *max_workers* requests are made concurrently over a single
+    requests.Session, so that connections to *url* are reused rather than
+    re-established for each time.  If *session* is not given, one from
+    connect() is used for this call.
+    """
+
+    def fetch(t):
         logger.info(f"unix timestamp: {t}")
-        position_result = requests.get(
+        position_result = s.get(
             url,
             params={
                 "event_time": t,  # Event time in unix datetime.
@@ -165,19 +210,33 @@ def get_position_and_pose(times: list, url: str, crs: str = "VIPER:910101", auth
         rj = position_result.json()
         logger.info(rj)
 
-        tpp.append(
-            (rj["event_seconds"], rj["location"][0], rj["location"][1], rj["yaw"])
-        )
+        return rj["event_seconds"], rj["location"][0], rj["location"][1], rj["yaw"]
+
+    with connect(max_workers) if session is None else nullcontext(session) as s:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tpp = np.array(list(executor.map(fetch, times)), dtype=TPP_DTYPE)
 
     return tpp
 
 
 def get_position_and_pose_range(
-    start_time, stop_time, url: str, crs: str = "VIPER:910101", auth=None
+    start_time,
+    stop_time,
+    url: str,
+    crs: str = "VIPER:910101",
+    auth=None,
+    session: Optional[requests.Session] = None,
 ):
-    tpp = []
+    """
+    Given a start and stop unix time and a URL that requests can be made
+    against, return a structured array with TPP_DTYPE of the times,
+    x-locations, y-locations, and yaws of the rover between them.
+
+    If *session* is given, the request is made with it, which can reuse its
+    open connection to *url*.
+    """
 
-    track_result = requests.get(
+    track_result = (requests if session is None else session).get(
         url,
         params={
             "min_time": start_time,
@@ -200,13 +259,15 @@ def get_position_and_pose_range(
     rj = track_result.json()
     logger.info(rj)
 
-    if isinstance(rj["event_seconds"], Sequence):
-        for time, loc, yaw in zip(rj["event_seconds"], rj["location"], rj["yaw"]):
-            tpp.append((time, loc[0], loc[1], yaw))
-    else:
-        tpp.append(
-            (rj["event_seconds"], rj["location"][0], rj["location"][1], rj["yaw"])
-        )
+    # A single position is returned as scalars rather than as lists.
+    times = np.atleast_1d(np.asarray(rj["event_seconds"], dtype=np.float64))
+    locations = np.asarray(rj["location"], dtype=np.float64).reshape(-1, 2)
+
+    tpp = np.empty(len(times), dtype=TPP_DTYPE)
+    tpp["t"] = times
+    tpp["x"] = locations[:, 0]
+    tpp["y"] = locations[:, 1]
+    tpp["yaw"] = rj["yaw"]
 
     return tpp
 
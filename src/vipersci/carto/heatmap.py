@@ -28,8 +28,7 @@ heatmap representation with individual points effectively averaged together.
 import logging
 import math
 import time
-from itertools import chain
-from multiprocessing import Pool
+from functools import lru_cache
 from typing import Any, Dict, Optional, Sequence, Tuple
 
 import numpy as np
@@ -37,13 +36,17 @@ import pyproj
 import rasterio
 import rasterio.features
 import shapely.geometry
-from numpy.typing import NDArray
-from sklearn.neighbors import KernelDensity
+from numpy.typing import DTypeLike, NDArray
+from scipy import ndimage
 
 from vipersci.carto.bounds import compute_bounds, pad_grid_align_bounds
 
 logger = logging.getLogger(__name__)
 
+# The approximate size of the temporary arrays that disk_sums() makes for
+# each chunk of points.
+_DISK_SUMS_BYTES = 64 * 2**20
+
 
 def buffered_mask(
     linestring: shapely.geometry.LineString,
@@ -59,55 +62,180 @@ def buffered_mask(
     In general, the returned array can be used as a numpy mask, where pixels
     that overlap the shapes are False.
 
-    The parameter *all_touched* is passed directly to
-    rasterio.features.geometry_mask(), and you can read more about it there.
+    By default, a pixel is unmasked when its center is no farther than
+    *buffer* from *linestring*.  Rather than buffering *linestring* into a
+    polygon, which is slow for a long traverse that crosses itself, the
+    pixels that *linestring* passes through are rasterized, and the distance
+    from every pixel center to them is found with a Euclidean distance
+    transform.  That distance is within half a pixel diagonal of the
+    distance to *linestring*, so only the pixels whose distance is that
+    close to *buffer* are tested against *linestring* itself.
+
+    If *all_touched* is True, the buffered polygon is rasterized with
+    rasterio.features.geometry_mask() instead, which also unmasks any pixel
+    that the polygon touches, and you can read more about it there.
     """
-    logger.debug("Start buffer")
-    start = time.perf_counter()
     logger.debug(linestring.bounds)
-    buffered = linestring.buffer(buffer, resolution=2)
-    if isinstance(buffered, shapely.geometry.Polygon):
-        geometries = [
-            buffered,
-        ]
-    else:  # MultiPolygon
-        geometries = buffered.geoms
-    logger.debug(f"Buffered geometries in {time.perf_counter() - start:.6f}s")
-
-    logger.debug(buffered.bounds)
-
-    window = rasterio.windows.from_bounds(*buffered.bounds, transform).round_lengths(
-        op="ceil"
-    )
+    left, bottom, right, top = linestring.bounds
+    window = rasterio.windows.from_bounds(
+        left - buffer, bottom - buffer, right + buffer, top + buffer, transform
+    ).round_lengths(op="ceil")
+    shape = rasterio.windows.shape(window)
 
     logger.debug(window)
 
-    logger.debug("Start geometry_mask")
     start = time.perf_counter()
-    mask = rasterio.features.geometry_mask(
-        geometries,
-        rasterio.windows.shape(window),
-        transform,
-        all_touched=all_touched,
-        invert=False,
+    if all_touched:
+        buffered = linestring.buffer(buffer, resolution=2)
+        mask = rasterio.features.geometry_mask(
+            [buffered], shape, transform, all_touched=True, invert=False
+        )
+        logger.debug(f"Created geometry_mask in {time.perf_counter() - start:.6f}s")
+        return mask
+
+    on_line = rasterio.features.rasterize(
+        [linestring], shape, transform=transform, all_touched=True, dtype=np.uint8
+    )
+    distance = ndimage.distance_transform_edt(
+        on_line == 0, sampling=(abs(transform.e), abs(transform.a))
     )
-    logger.debug(f"Created geometry_mask in {time.perf_counter() - start:.6f}s")
+    half_diagonal = math.hypot(transform.a, transform.e) / 2
+
+    mask = distance > buffer
+    rows, cols = np.nonzero(np.abs(distance - buffer) <= half_diagonal)
+    if rows.size:
+        # The pixel centers near the edge of the buffer are checked against
+        # the segments of the line that are near them.
+        xs, ys = transform * (cols + 0.5, rows + 0.5)
+
+        # The segments are only between consecutive vertices of the same part,
+        # since the parts of a MultiLineString aren't joined.  Any Points that
+        # an intersection left have no segments, and are used as they are.
+        parts = shapely.get_parts(linestring)
+        coords, part = shapely.get_coordinates(parts, return_index=True)
+        same = part[:-1] == part[1:]
+        segments = shapely.linestrings(
+            np.stack((coords[:-1][same], coords[1:][same]), axis=1)
+        )
+        points = parts[shapely.get_type_id(parts) == shapely.GeometryType.POINT]
+        p_idx = shapely.STRtree(np.concatenate((segments, points))).query(
+            shapely.points(xs, ys), predicate="dwithin", distance=buffer
+        )[0]
+        within = np.zeros(rows.size, dtype=bool)
+        within[p_idx] = True
+        mask[rows, cols] = ~within
+    logger.debug(f"Created mask in {time.perf_counter() - start:.6f}s")
 
     return mask
 
 
-def as_ndarray(input: Sequence) -> NDArray:
+@lru_cache(maxsize=8)
+def _cached_sample_pixels(
+    wkb: bytes, transform: rasterio.Affine, buffer: float
+) -> Tuple[NDArray[np.bool_], NDArray[np.intp], NDArray[np.intp]]:
+    """
+    Returns a read-only buffered_mask() of the geometry in *wkb*, and the
+    read-only rows and columns of its unmasked pixels in row-major order.
+
+    These are cached by the geometry's WKB, rather than by the identity
+    of the input arrays, so that calls for the same traverse with different
+    values (like multiple detectors) only buffer and rasterize it, and find
+    the pixels to sample, once.
+    """
+    mask = buffered_mask(shapely.from_wkb(wkb), transform, buffer)
+    rows, cols = np.nonzero(~mask)
+    for a in (mask, rows, cols):
+        a.flags.writeable = False
+    return mask, rows, cols
+
+
+def as_ndarray(input: Sequence, dtype: Optional[DTypeLike] = None) -> NDArray:
     """
     Check the type of the input and return it as an np ndarray, converting if needed
     Parameters:
         input
+        dtype: if given, the dtype of the returned array.  Giving it for a list
+            of numbers also lets numpy skip inferring the dtype from each element.
     Returns:
         ndarray
     """
-    if isinstance(input, np.ndarray):
+    if isinstance(input, np.ndarray) and (dtype is None or input.dtype == dtype):
         return input
 
-    return np.asarray(input)
+    return np.asarray(input, dtype=dtype)
+
+
+def disk_sums(
+    shape: Tuple[int, int],
+    transform: rasterio.Affine,
+    x_coords: NDArray,
+    y_coords: NDArray,
+    values: NDArray,
+    radius: float,
+    chunk_size: Optional[int] = None,
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Returns a tuple of two arrays of *shape* on the grid defined by
+    *transform*: the number of points that are within *radius* of the center
+    of each pixel, and the sum of the *values* of those points.
+
+    These are exactly the quantities that a tophat kernel density estimate
+    of bandwidth *radius* scales, but rather than evaluating a kernel at
+    every pixel center, only the pixels in a square window around each point
+    are tested, for a chunk of *chunk_size* points at a time.  If
+    *chunk_size* is None, it is as many points as keep the temporary arrays
+    of a chunk to about 64 MB, so that a large *radius* doesn't take more
+    memory.
+    """
+    counts = np.zeros(shape[0] * shape[1])
+    totals = np.zeros(shape[0] * shape[1])
+
+    x_size = transform.a
+    y_size = transform.e
+    col_offsets = np.arange(
+        -math.ceil(radius / abs(x_size)), math.ceil(radius / abs(x_size)) + 1
+    )
+    row_offsets = np.arange(
+        -math.ceil(radius / abs(y_size)), math.ceil(radius / abs(y_size)) + 1
+    )
+    radius_sq = radius * radius
+
+    if chunk_size is None:
+        # Each pixel of a point's window takes about 40 bytes: its squared
+        # distance, and the indexes and values of the pixels within *radius*.
+        window_bytes = row_offsets.size * col_offsets.size * 40
+        chunk_size = max(1, _DISK_SUMS_BYTES // window_bytes)
+
+    for start in range(0, len(values), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        x = x_coords[chunk, np.newaxis]
+        y = y_coords[chunk, np.newaxis]
+
+        # The rows and columns of each point's window, and the squared
+        # distances from each point to the centers of those rows and columns.
+        cols = np.floor((x - transform.c) / x_size).astype(np.intp) + col_offsets
+        rows = np.floor((y - transform.f) / y_size).astype(np.intp) + row_offsets
+        dx_sq = (transform.c + (cols + 0.5) * x_size - x) ** 2
+        dy_sq = (transform.f + (rows + 0.5) * y_size - y) ** 2
+        dx_sq[(cols < 0) | (cols >= shape[1])] = np.inf
+        dy_sq[(rows < 0) | (rows >= shape[0])] = np.inf
+
+        n, i, j = np.nonzero(
+            dy_sq[:, :, np.newaxis] + dx_sq[:, np.newaxis, :] < radius_sq
+        )
+        if n.size == 0:
+            continue
+
+        # Points along a traverse are close together, so only the span of
+        # the grid that this chunk touches is binned.
+        flat = rows[n, i] * shape[1] + cols[n, j]
+        lo = flat.min()
+        flat -= lo
+        span = slice(lo, lo + flat.max() + 1)
+        counts[span] += np.bincount(flat)
+        totals[span] += np.bincount(flat, weights=values[chunk][n])
+
+    return counts.reshape(shape), totals.reshape(shape)
 
 
 def generate_density_heatmap(
@@ -149,8 +277,9 @@ def generate_density_heatmap(
         nodata_value: Defaults to zero, but a different value can be specified.
         transform: If a rasterio Affine transform is not supplied (the
             default), then one will be generated, and returned.
-        processes: Number of processes to use when sampling the output distribution.
-            Defaults to None, allowing multiprocessing to decide how many to use.
+        processes: No longer used, since the density is computed directly from
+            the points rather than by sampling a fitted estimator in separate
+            processes.  Must still be a positive integer.  Defaults to 1.
         sample_bounds: polygon bounding the region in which to actually sample data.
             Defaults to None, sampling over the entire region.
         frequencies: frequency values returned from a previous call to
@@ -177,13 +306,13 @@ def generate_density_heatmap(
     if not len(x_coords) == len(y_coords) == len(values):
         raise ValueError("Input arrays must be of the same length.")
 
-    values_all = as_ndarray(values)
-
-    missing_idx = np.isnan(values_all.astype(float))
+    # Converting to float turns any None values into np.nan.
+    values_all = as_ndarray(values, np.float64)
+    valid = ~np.isnan(values_all)
 
-    x_coords_np = np.delete(as_ndarray(x_coords), np.argwhere(missing_idx))
-    y_coords_np = np.delete(as_ndarray(y_coords), np.argwhere(missing_idx))
-    values_np = np.delete(values_all, np.argwhere(missing_idx))
+    x_coords_np = as_ndarray(x_coords, np.float64)[valid]
+    y_coords_np = as_ndarray(y_coords, np.float64)[valid]
+    values_np = values_all[valid]
 
     points = shapely.geometry.LineString(np.stack((x_coords_np, y_coords_np), axis=1))
     if sample_bounds is not None:
@@ -212,95 +341,54 @@ def generate_density_heatmap(
             )
 
     start = time.perf_counter()
-    mask = buffered_mask(points, transform, buffer)
+    # The rows and columns of the unmasked pixels are in row-major order,
+    # which is the order of *frequencies*.
+    mask, rows, cols = _cached_sample_pixels(points.wkb, transform, buffer)
     end = time.perf_counter()
-    logger.debug(f"Created mask in {end - start:.6f}s")
+    logger.debug(f"Created mask and unmasked coordinates in {end - start:.6f}s")
 
-    train = np.column_stack([y_coords_np, x_coords_np])
-    kde = KernelDensity(
-        bandwidth=radius, metric="euclidean", kernel="tophat", algorithm="auto"
-    )
-    start = time.perf_counter()
-    kde.fit(train)
-    end = time.perf_counter()
-    logger.debug(f"Trained unweighted KDE in {end - start:.6f}s")
-
-    # Now get unmasked coordinates:
     start = time.perf_counter()
-    row_coords, col_coords = np.meshgrid(
-        range(mask.shape[0]), range(mask.shape[1]), indexing="ij"
-    )
-    row_masked: np.ma.MaskedArray = np.ma.MaskedArray(row_coords, mask)
-    col_masked: np.ma.MaskedArray = np.ma.MaskedArray(col_coords, mask)
-
-    x_tosample, y_tosample = rasterio.transform.xy(
-        transform, row_masked.compressed(), col_masked.compressed()
+    observations, value_sums = disk_sums(
+        mask.shape,
+        transform,
+        x_coords_np,
+        y_coords_np,
+        values_np,
+        radius,
     )
-
-    sample_coords = np.column_stack([y_tosample, x_tosample])
     end = time.perf_counter()
-    logger.debug(f"Created unmasked coordinates {end - start:.6f}s")
-
-    if frequencies is None:
-        start = time.perf_counter()
-        with Pool(processes=processes) as pool:
-            results = pool.imap(
-                kde.score_samples,
-                np.array_split(sample_coords, processes),
-            )
-            samples = np.fromiter(
-                chain.from_iterable(results),
-                dtype=float,
-                count=len(sample_coords),
-            )
-        out_unweighted = np.exp(samples)
-        total_observations = len(train)
-        frequencies = out_unweighted * total_observations
-        frequencies = (frequencies > 1e-9) * frequencies
-        end = time.perf_counter()
-        logger.info(f"Sampled {samples.shape[0]} points in {end - start:.6f}s.")
-
-    start = time.perf_counter()
-    kde.fit(train, sample_weight=values_np)
-    end = time.perf_counter()
-    logger.debug(f"Trained weighted KDE in {end - start:.6f}s")
-
-    start = time.perf_counter()
-    with Pool(processes=processes) as pool:
-        results = pool.imap(
-            kde.score_samples,
-            np.array_split(sample_coords, processes),
-        )
-        weighted_samples = np.fromiter(
-            chain.from_iterable(results), dtype=float, count=len(sample_coords)
-        )
-    end = time.perf_counter()
-    logger.info(
-        f"Sampled {weighted_samples.shape[0]} weighted points in {end - start:.6f}s."
-    )
+    logger.info(f"Summed {len(values_np)} observations in {end - start:.6f}s.")
 
     # compute our required stats
     start = time.perf_counter()
-    out_weighted = np.exp(weighted_samples)
-    out_weighted = (out_weighted > 1e-9) * out_weighted
-    total_counts = np.sum(values_np) * out_weighted
 
+    # The tophat kernel density at a pixel is the number of observations
+    # within radius of it divided by the area of the kernel's disk, so that
+    # frequencies are the height of cylinders with radius of bandwidth.
+    disk_area = math.pi * math.pow(radius, 2)
+    if frequencies is None:
+        frequencies = observations[rows, cols] / disk_area
+
+    # The sums are gathered into a new array, so the rest of the arithmetic
+    # is done in place on it, rather than allocating a temporary array the
+    # size of the unmasked pixels for each step.
+    avg_values = value_sums[rows, cols]
+    avg_values /= disk_area
     with np.errstate(divide="ignore", invalid="ignore"):
-        avg_values = np.nan_to_num(total_counts / frequencies, posinf=0, copy=False)
+        np.divide(avg_values, frequencies, out=avg_values)
+    np.nan_to_num(avg_values, posinf=0, copy=False)
 
-    # frequencies starts as the height of cylinders with radius of bandwidth,
-    # but the meaningful value is their volume
-    counts = np.around(frequencies * math.pi * math.pow(radius, 2))
+    # The meaningful value of the frequencies is their volume.
+    counts = np.multiply(frequencies, disk_area)
+    np.around(counts, out=counts)
 
     end = time.perf_counter()
     logger.info(f"Computed stats in {end - start:.6f}s")
 
     out_avg = np.full_like(mask, nodata_value, dtype=np.float32)
     out_counts = np.full_like(mask, 0, dtype=np.uintc)
-    for x, y, avg, count in zip(x_tosample, y_tosample, avg_values, counts):
-        r, c = rasterio.transform.rowcol(transform, x, y)
-        out_avg[r, c] = avg
-        out_counts[r, c] = count
+    out_avg[rows, cols] = avg_values
+    out_counts[rows, cols] = counts
 
     return transform, out_counts, out_avg, frequencies
 
@@ -318,6 +406,9 @@ def write_geotiff_rasterio(
     """
     Writes 2D data to a geotiff file
 
+    Unless *profile* says otherwise, the geotiff is written in 512 by 512 pixel
+    tiles, one block at a time, which GDAL compresses with all available cores.
+
     Parameters
         out_filepath: Absolute filepath for writing
         dest_crs: The Rasterio CRS that applies to the data
@@ -331,12 +422,21 @@ def write_geotiff_rasterio(
             Will be merged / updated with basic information about the raster itself.
             Defaults to an empty dictionary (no additional data).
         compress: Compression method to use if not specified in profile.
-            Any value supported by GDAL - defaults to "deflate"
+            Any value supported by GDAL - defaults to "deflate".  Unless given in
+            profile, "deflate" uses its fastest level, and integer data is
+            compressed with the horizontal differencing predictor.
     Returns
         A dictionary that mimics the information provided by gdalinfo
     """
     unified_profile: Dict[str, Any] = {
         "driver": "GTiff",
+        # Tiles let GDAL compress and write each block as it is given, and
+        # compress the blocks with all of the available cores.
+        "tiled": True,
+        "blockxsize": 512,
+        "blockysize": 512,
+        "bigtiff": "IF_SAFER",
+        "num_threads": "ALL_CPUS",
     }
 
     unified_profile.update(profile)
@@ -356,14 +456,39 @@ def write_geotiff_rasterio(
     if "compress" not in profile:
         unified_profile.update(compress=compress)
 
+    # The fastest deflate level takes about half the time of the default
+    # level, for files that are only a little larger.  Differencing neighboring
+    # pixels makes integer counts more compressible, but the floating point
+    # predictor makes density heatmaps larger, so it is not used by default.
+    method = str(unified_profile["compress"]).lower()
+    if method == "deflate" and "zlevel" not in profile:
+        unified_profile.update(zlevel=1)
+    if (
+        method in ("deflate", "lzw", "zstd")
+        and "predictor" not in profile
+        and np.issubdtype(data[0].dtype, np.integer)
+    ):
+        unified_profile.update(predictor=2)
+
     with rasterio.open(out_filepath, "w", **unified_profile) as raster:
         for i, d in enumerate(data, start=1):
-            raster.write(d, i)
+            for _, window in raster.block_windows(i):
+                raster.write(d[window.toslices()], i, window=window)
         gdalinfo = get_gdal_info_from_rasterio(raster, source_crs)
 
     return gdalinfo
 
 
+@lru_cache(maxsize=32)
+def _transformer(crs_from: str, crs_to: str) -> pyproj.Transformer:
+    """
+    Returns a cached pyproj.Transformer between the CRSs given as WKT strings,
+    since creating one is much slower than using it, and the same pair of
+    CRSs is used for every GeoTIFF written.
+    """
+    return pyproj.Transformer.from_crs(crs_from, crs_to)
+
+
 def get_gdal_info_from_rasterio(
     input: rasterio.DatasetReader, source_crs: pyproj.crs.CRS
 ) -> Dict[str, Any]:
@@ -421,8 +546,8 @@ def get_gdal_info_from_rasterio(
             input.bounds.top,
             input.bounds.bottom,
         ]
-        lon_bnds, lat_bnds = pyproj.Transformer.from_crs(
-            input.crs, source_crs
+        lon_bnds, lat_bnds = _transformer(
+            input.crs.to_wkt(), source_crs.to_wkt()
         ).transform(x, y)
 
         result["extent"] = {
@@ -491,10 +616,13 @@ def generate_area_bin_heatmap(
                 coordinates
             grid_size: resolution of the grid
         """
-        x_min = grid_size * math.floor(np.amin(x_coords) / grid_size) - padding
-        y_min = grid_size * math.floor(np.amin(y_coords) / grid_size) - padding
-        x_max = grid_size * math.ceil(np.amax(x_coords) / grid_size) + padding
-        y_max = grid_size * math.ceil(np.amax(y_coords) / grid_size) + padding
+        left, bottom, right, top = compute_bounds(
+            as_ndarray(x_coords, np.float64), as_ndarray(y_coords, np.float64)
+        )
+        x_min = grid_size * math.floor(left / grid_size) - padding
+        y_min = grid_size * math.floor(bottom / grid_size) - padding
+        x_max = grid_size * math.ceil(right / grid_size) + padding
+        y_max = grid_size * math.ceil(top / grid_size) + padding
 
         width = x_max - x_min
         height = y_max - y_min
@@ -557,8 +685,29 @@ def area_bin(
     y_bins = np.arange(bottom, top + y_bin_size, step=y_bin_size)
     bins = (x_bins, y_bins)
 
-    counts, _, _ = np.histogram2d(x_coords, y_coords, bins=bins)
-    value_totals, _, _ = np.histogram2d(x_coords, y_coords, bins=bins, weights=values)
+    # Find the bin of each point once, like np.histogram2d() would, and then
+    # count and sum the points with np.bincount(), rather than having
+    # np.histogram2d() bin all of the points a second time for the sums.
+    shape = (len(x_bins) - 1, len(y_bins) - 1)
+    indices = []
+    for coords, edges in zip((x_coords, y_coords), bins):
+        i = np.searchsorted(edges, coords, side="right") - 1
+        # The last bin includes its right edge.
+        i[coords == edges[-1]] -= 1
+        indices.append(i)
+
+    inside = (
+        (indices[0] >= 0)
+        & (indices[0] < shape[0])
+        & (indices[1] >= 0)
+        & (indices[1] < shape[1])
+    )
+    flat = np.ravel_multi_index((indices[0][inside], indices[1][inside]), shape)
+    size = shape[0] * shape[1]
+    counts = np.bincount(flat, minlength=size).reshape(shape).astype(np.float64)
+    value_totals = np.bincount(
+        flat, weights=np.asarray(values, dtype=np.float64)[inside], minlength=size
+    ).reshape(shape)
 
     with np.errstate(divide="ignore", invalid="ignore"):
         averages = np.nan_to_num(value_totals / counts, posinf=0, copy=False)
@@ -28,7 +28,6 @@ what the mass20 and mass40 signal intensities would be.
 # top level of this library.
 
 import argparse
-import csv
 import logging
 from pathlib import Path
 
@@ -37,6 +36,7 @@ import rasterio
 
 from vipersci import msolo
 from vipersci.carto.nss_modeler import write_tif
+from vipersci.carto.traverse import read_traverse, rowcols, write_traverse
 
 logger = logging.getLogger(__name__)
 
@@ -85,16 +85,54 @@ class LocationSimulator:
         :type temp_map: Path
 
         """
-        self.bd_aff, self.bd_arr = self._init_map(bd_map)
-        self.temp_aff, self.temp_arr = self._init_map(temp_map)
+        self.bd_aff, self.bd_data = self._init_map(bd_map)
+        self.temp_aff, self.temp_data = self._init_map(temp_map)
 
         return
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the maps."""
+        self.bd_data.close()
+        self.temp_data.close()
+
     @staticmethod
     def _init_map(raster: Path):
         # Helper function for __init__()
+        # The dataset is kept open, rather than read, so that only the part
+        # of the map under the requested locations is ever in memory.
         data = rasterio.open(raster)
-        return data.transform, data.read(1)
+        return data.transform, data
+
+    @staticmethod
+    def _read_pixels(data, rows, cols):
+        # Helper function for __call__(), returns the pixels of the first band
+        # of the *data* dataset at *rows* and *cols*, reading only the window
+        # that contains them.
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        if rows.size == 0:
+            return np.empty(rows.shape, dtype=data.dtypes[0])
+
+        row_min, col_min = rows.min(), cols.min()
+        row_max, col_max = rows.max(), cols.max()
+        if (
+            row_min < 0
+            or col_min < 0
+            or row_max >= data.height
+            or col_max >= data.width
+        ):
+            raise IndexError(f"A location is outside of the {data.name} map.")
+
+        window = rasterio.windows.Window(
+            col_min, row_min, col_max - col_min + 1, row_max - row_min + 1
+        )
+        return data.read(1, window=window)[rows - row_min, cols - col_min]
 
     def __call__(self, xycoords: np.ndarray, poisson=False):
         """
@@ -109,15 +147,17 @@ class LocationSimulator:
         one  location, then the returned two-tuple will be a numpy array
         of H20 band depth values, and a numpy array of OH band depth values.
         """
-        bd_rows, bd_cols = rasterio.transform.rowcol(
-            self.bd_aff, xycoords[0], xycoords[1]
-        )
-        temp_rows, temp_cols = rasterio.transform.rowcol(
-            self.temp_aff, xycoords[0], xycoords[1]
+        (bd_rows, bd_cols), (temp_rows, temp_cols) = rowcols(
+            (self.bd_aff, self.temp_aff), xycoords[0], xycoords[1]
         )
 
-        bd_vals = self.bd_arr[bd_rows, bd_cols]
-        temp_vals = self.temp_arr[temp_rows, temp_cols]
+        # The models are evaluated in double precision, which is what a single
+        # location from a float32 map is promoted to, so that evaluating many
+        # locations at once gives the same values as evaluating them one by one.
+        bd_vals = self._read_pixels(self.bd_data, bd_rows, bd_cols).astype(np.float64)
+        temp_vals = self._read_pixels(self.temp_data, temp_rows, temp_cols).astype(
+            np.float64
+        )
 
         m20 = msolo.mass20(temp_vals, bd_vals)
         m40 = msolo.mass40(temp_vals)
@@ -140,11 +180,11 @@ def main():
                     "are different.  They must be the same to output detector maps."
                 )
 
-        m20 = msolo.mass20(temp_data.read(1).flatten(), bd_data.read(1).flatten())
-        m40 = msolo.mass40(temp_data.read(1).flatten())
-
-        m20_arr = m20.reshape(bd_data.shape)
-        m40_arr = m40.reshape(bd_data.shape)
+        # The models are element-wise, so they are applied to the whole maps,
+        # and each map is only read once.
+        temp_arr = temp_data.read(1)
+        m20_arr = msolo.mass20(temp_arr, bd_data.read(1))
+        m40_arr = msolo.mass40(temp_arr)
 
         kwds = bd_data.profile
         write_tif(args.output, "_m20.tif", m20_arr, kwds)
@@ -152,31 +192,11 @@ def main():
         return
 
     else:
-        # Make an output traverse file.
-        simulator = LocationSimulator(
-            args.burial_depth,
-            args.temperature,
-        )
+        # Make an output traverse file, expecting at least x and y columns.
+        df = read_traverse(args.traverse)
+        with LocationSimulator(args.burial_depth, args.temperature) as simulator:
+            df["m20"], df["m40"] = simulator(df[["x", "y"]].to_numpy(dtype=float).T)
 
-        with open(args.traverse, newline="") as csvin, open(
-            args.output, "w", newline=""
-        ) as csvout:
-            reader = csv.DictReader(csvin)  # expecting at least x and y cols.
-            fieldnames = reader.fieldnames + [
-                "m20",
-                "m40",
-            ]
-            writer = csv.DictWriter(csvout, fieldnames=fieldnames)
-            writer.writeheader()
-
-            # Would it be faster to read in all the points, feed them all to the
-            # simulator, and then write out points?  Maybe, iterating for now:
-            for row in reader:
-                coords = np.array((row["x"], row["y"]), dtype=float)
-                # print(coords)
-                # print(coords.shape)
-                row["m20"], row["m40"] = simulator(coords)
-
-                writer.writerow(row)
+        write_traverse(df, args.output)
 
     return
@@ -28,7 +28,6 @@ what the OH and H2O band depths would be.
 # top level of this library.
 
 import argparse
-import csv
 import logging
 from pathlib import Path
 
@@ -36,7 +35,12 @@ import numpy as np
 import rasterio
 
 from vipersci import nirvss
-from vipersci.carto.nss_modeler import write_tif
+from vipersci.carto.nss_modeler import (
+    block_windows,
+    build_overviews,
+    tiled_profile,
+)
+from vipersci.carto.traverse import read_traverse, rowcols, write_traverse
 
 logger = logging.getLogger(__name__)
 
@@ -118,19 +122,16 @@ class LocationSimulator:
         one  location, then the returned two-tuple will be a numpy array
         of H20 band depth values, and a numpy array of OH band depth values.
         """
-        bd_rows, bd_cols = rasterio.transform.rowcol(
-            self.bd_aff, xycoords[0], xycoords[1]
-        )
-        insl_rows, insl_cols = rasterio.transform.rowcol(
-            self.insl_aff, xycoords[0], xycoords[1]
-        )
-        temp_rows, temp_cols = rasterio.transform.rowcol(
-            self.temp_aff, xycoords[0], xycoords[1]
+        (bd_rows, bd_cols), (insl_rows, insl_cols), (temp_rows, temp_cols) = rowcols(
+            (self.bd_aff, self.insl_aff, self.temp_aff), xycoords[0], xycoords[1]
         )
 
-        bd_vals = self.bd_arr[bd_rows, bd_cols]
-        insl_vals = self.insl_arr[insl_rows, insl_cols]
-        temp_vals = self.temp_arr[temp_rows, temp_cols]
+        # The models are evaluated in double precision, which is what a single
+        # location from a float32 map is promoted to, so that evaluating many
+        # locations at once gives the same values as evaluating them one by one.
+        bd_vals = self.bd_arr[bd_rows, bd_cols].astype(np.float64)
+        insl_vals = self.insl_arr[insl_rows, insl_cols].astype(np.float64)
+        temp_vals = self.temp_arr[temp_rows, temp_cols].astype(np.float64)
 
         h2o_vals = nirvss.band_depth_H2O(temp_vals, bd_vals)
         oh_vals = nirvss.band_depth_OH(insl_vals)
@@ -155,17 +156,26 @@ def main():
                         "different.  They must be the same to output detector maps."
                     )
 
-        h2o = nirvss.band_depth_H2O(
-            temp_data.read(1).flatten(), bd_data.read(1).flatten()
-        )
-        oh = nirvss.band_depth_OH(insl_data.read(1).flatten())
-
-        h2o_arr = h2o.reshape(bd_data.shape)
-        oh_arr = oh.reshape(bd_data.shape)
-
-        kwds = bd_data.profile
-        write_tif(args.output, "_h2o.tif", h2o_arr, kwds)
-        write_tif(args.output, "_oh.tif", oh_arr, kwds)
+        # The models are element-wise, so they are applied to small blocks of
+        # the maps at a time, whose intermediate arrays stay in the CPU cache,
+        # rather than to whole maps, whose intermediate arrays are each as
+        # large as a map.
+        kwds = tiled_profile(bd_data.profile, bd_data.dtypes[0])
+        with rasterio.open(
+            args.output.with_name(args.output.name + "_h2o.tif"), "w", **kwds
+        ) as h2o_data, rasterio.open(
+            args.output.with_name(args.output.name + "_oh.tif"), "w", **kwds
+        ) as oh_data:
+            for window in block_windows(bd_data, size=256):
+                h2o = nirvss.band_depth_H2O(
+                    temp_data.read(1, window=window), bd_data.read(1, window=window)
+                )
+                oh = nirvss.band_depth_OH(insl_data.read(1, window=window))
+                h2o_data.write(h2o, 1, window=window)
+                oh_data.write(oh, 1, window=window)
+
+            build_overviews(h2o_data)
+            build_overviews(oh_data)
         return
 
     else:
@@ -176,25 +186,10 @@ def main():
             args.temperature,
         )
 
-        with open(args.traverse, newline="") as csvin, open(
-            args.output, "w", newline=""
-        ) as csvout:
-            reader = csv.DictReader(csvin)  # expecting at least x and y cols.
-            fieldnames = reader.fieldnames + [
-                "bd_h2o",
-                "bd_oh",
-            ]
-            writer = csv.DictWriter(csvout, fieldnames=fieldnames)
-            writer.writeheader()
-
-            # Would it be faster to read in all the points, feed them all to the
-            # simulator, and then write out points?  Maybe, iterating for now:
-            for row in reader:
-                coords = np.array((row["x"], row["y"]), dtype=float)
-                # print(coords)
-                # print(coords.shape)
-                row["bd_h2o"], row["bd_oh"] = simulator(coords)
-
-                writer.writerow(row)
+        # Expecting at least x and y columns.
+        df = read_traverse(args.traverse)
+        df["bd_h2o"], df["bd_oh"] = simulator(df[["x", "y"]].to_numpy(dtype=float).T)
+
+        write_traverse(df, args.output)
 
     return
@@ -34,7 +34,6 @@ each location.
 # top level of this library.
 
 import argparse
-import csv
 import logging
 from pathlib import Path
 
@@ -43,6 +42,7 @@ import rasterio
 
 from vipersci import nss
 from vipersci.carto.nss_modeler import write_tif
+from vipersci.carto.traverse import read_traverse, rowcols, write_traverse
 
 logger = logging.getLogger(__name__)
 
@@ -144,11 +144,8 @@ class LocationSimulator:
         one  location, then the returned two-tuple will be a numpy array
         of detector 1 values, and a numpy array of detector 2 values.
         """
-        bd_rows, bd_cols = rasterio.transform.rowcol(
-            self.bd_aff, xycoords[0], xycoords[1]
-        )
-        weh_rows, weh_cols = rasterio.transform.rowcol(
-            self.weh_aff, xycoords[0], xycoords[1]
+        (bd_rows, bd_cols), (weh_rows, weh_cols) = rowcols(
+            (self.bd_aff, self.weh_aff), xycoords[0], xycoords[1]
         )
 
         bd_vals = self.bd_arr[bd_rows, bd_cols]
@@ -176,7 +173,8 @@ def main():
             args.det1, args.det2, bounds_error=False, fill_value=None
         )
 
-        d1, d2 = ds(bd_data.read(1).flatten(), weh_data.read(1).flatten())
+        # Unlike flatten(), ravel() does not copy the contiguous maps.
+        d1, d2 = ds(bd_data.read(1).ravel(), weh_data.read(1).ravel())
 
         d1_arr = d1.reshape(bd_data.shape)
         d2_arr = d2.reshape(bd_data.shape)
@@ -201,23 +199,12 @@ def main():
             fill_value=None,
         )
 
-        with open(args.traverse, newline="") as csvin, open(
-            args.output, "w", newline=""
-        ) as csvout:
-            reader = csv.DictReader(csvin)  # expecting at least x and y cols.
-            fieldnames = reader.fieldnames + ["det1", "det2", "det1pois", "det2pois"]
-            writer = csv.DictWriter(csvout, fieldnames=fieldnames)
-            writer.writeheader()
-
-            # Would it be faster to read in all the points, feed them all to the
-            # simulator, and then write out points?  Maybe, iterating for now:
-            for row in reader:
-                coords = np.array((row["x"], row["y"]), dtype=float)
-                # print(coords)
-                # print(coords.shape)
-                row["det1"], row["det2"] = simulator(coords)
-                row["det1pois"], row["det2pois"] = simulator(coords, poisson=True)
-
-                writer.writerow(row)
+        # Expecting at least x and y columns.
+        df = read_traverse(args.traverse)
+        coords = df[["x", "y"]].to_numpy(dtype=float).T
+        df["det1"], df["det2"] = simulator(coords)
+        df["det1pois"], df["det2pois"] = simulator(coords, poisson=True)
+
+        write_traverse(df, args.output)
 
     return
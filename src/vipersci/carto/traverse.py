@@ -0,0 +1,78 @@
+"""
+The traverse module has functions that are shared by the programs that
+work with a traverse of locations on maps.
+"""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import os
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import rasterio
+from numpy.typing import ArrayLike, NDArray
+
+
+def rowcols(
+    transforms: Sequence[rasterio.Affine], x: ArrayLike, y: ArrayLike
+) -> List[Tuple[NDArray[np.intp], NDArray[np.intp]]]:
+    """
+    Returns a list of the rows and columns of the *x*, *y* locations in each
+    of the maps with the given *transforms*.
+
+    These are the same as rasterio.transform.rowcol() gives, but for all of
+    the locations at once with numpy, rather than by looping over them in
+    Python.  The maps usually share a transform, and then the rows and
+    columns are only found once.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    found = dict()
+    for t in transforms:
+        if t not in found:
+            cols, rows = ~t * (x, y)
+            found[t] = (np.floor(rows).astype(np.intp), np.floor(cols).astype(np.intp))
+
+    return [found[t] for t in transforms]
+
+
+def read_traverse(path: Union[os.PathLike, str]) -> pd.DataFrame:
+    """
+    Returns a DataFrame of the traverse CSV file at *path*.
+
+    All of the columns are read as text, so that write_traverse() writes
+    them back out exactly as they were read, after which any columns that
+    were added, like simulated values, are written as numbers.
+    """
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def write_traverse(df: pd.DataFrame, path: Union[os.PathLike, str]):
+    """
+    Writes *df* to a CSV file at *path*, without its index.
+
+    The lines end with \\r\\n, as they did when these files were written
+    with the csv module.
+    """
+    df.to_csv(path, index=False, lineterminator="\r\n")
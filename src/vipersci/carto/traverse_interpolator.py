@@ -26,13 +26,17 @@
 # top level of this library.
 
 import argparse
-import csv
 import logging
 from pathlib import Path
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
 from shapely.geometry import Point
 
+from vipersci.carto.traverse import write_traverse
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,11 +63,14 @@ def arg_parser():
 def main():
     args = arg_parser().parse_args()
 
-    points = list()
     df = gpd.read_file(args.json)
     # ['start_time', 'uuid', 'item_type', 'end_time', 'duration', 'name',
     # 'color', 'text_color', 'activity_type', 'style', 'geometry']
 
+    # The number of points from each "Driving" segment, and from the time
+    # spent stopped before it, are counted first, so that the output arrays
+    # are only allocated once.
+    segments = list()
     last_point = Point(0, 0)
     last_time = None
     for row in df.itertuples():
@@ -73,31 +80,43 @@ def main():
         # If two consecutive "Driving" segments have the same end and
         # beginning coordinates, but the time is different, that means
         # that time passed while we sat there.
-        # print(f"Points: {row.geometry.coords[0]} == {last_point.coords[0]} ")
-        # print(f"Times: {row.start_time} != {last_time}")
         if (
             row.geometry.coords[0] == last_point.coords[0]
             and row.start_time != last_time
         ):
-            time_intervals = interval_count(last_time, row.start_time, args.interval)
-            for s in range(time_intervals):
-                t = last_time + (s * args.interval)
-                points.append({"time": t, "x": last_point.x, "y": last_point.y})
-
-        time_intervals = interval_count(row.start_time, row.end_time, args.interval)
-        for s in range(time_intervals):
-            t = row.start_time + (s * args.interval)
-            p = row.geometry.interpolate(s / time_intervals, normalized=True)
-            points.append({"time": t, "x": p.x, "y": p.y})
+            gap = interval_count(last_time, row.start_time, args.interval)
+        else:
+            gap = 0
+
+        count = interval_count(row.start_time, row.end_time, args.interval)
+        segments.append((row, last_time, last_point, gap, count))
         last_time = row.end_time
         last_point = Point(row.geometry.coords[-1])
 
-    with open(args.output, "w", newline="") as csvfile:
-        fieldnames = ["time", "x", "y"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for d in points:
-            writer.writerow(d)
+    total = sum(gap + count for *_, gap, count in segments)
+    times = np.empty(total)
+    xs = np.empty(total)
+    ys = np.empty(total)
+
+    i = 0
+    for row, last_time, last_point, gap, count in segments:
+        if gap:
+            times[i : i + gap] = last_time + (np.arange(gap) * args.interval)
+            xs[i : i + gap] = last_point.x
+            ys[i : i + gap] = last_point.y
+            i += gap
+
+        # All of the points along the segment are interpolated at once.
+        steps = np.arange(count)
+        p = shapely.line_interpolate_point(row.geometry, steps / count, normalized=True)
+        times[i : i + count] = row.start_time + (steps * args.interval)
+        xs[i : i + count] = shapely.get_x(p)
+        ys[i : i + count] = shapely.get_y(p)
+        i += count
+
+    write_traverse(
+        pd.DataFrame({"time": times, "x": xs, "y": ys}, copy=False), args.output
+    )
 
     return
 
@@ -45,11 +45,14 @@ This file format is not particularly a standard, but is simple to process.
 
 import argparse
 import logging
+import warnings
 
 # import csv
 from pathlib import Path
 
 import geopandas
+import numpy as np
+import shapely
 from pyproj import CRS, Transformer
 
 # from osgeo import ogr, osr
@@ -133,6 +136,7 @@ def arg_parser():
     )
     parser.add_argument(
         "--replace_with_zero",
+        type=float,
         help="If there is a value that should be replaced with zero, it can "
         "be provided here.  If the --value_name is 'Depth (m)' this will "
         "automatically be set to '-1'.  If you want to override that, "
@@ -206,40 +210,37 @@ def main():
     t_crs = CRS(t_srs)
     transformer = Transformer.from_crs(s_crs, t_crs)
 
-    values = {k: [] for k in value_keys}
-
-    polys = list()
-    with open(args.file, "r") as f:
-        logger.info(f"Reading vertices from {args.file}")
-        for line in f:
-            tokens = line.split()
+    # The facets are read in all at once, so that their vertexes can be
+    # transformed together, rather than line by line.
+    logger.info(f"Reading vertices from {args.file}")
+    with warnings.catch_warnings():
+        # An empty file is reported below, rather than with numpy's warning.
+        warnings.simplefilter("ignore", UserWarning)
+        facets = np.loadtxt(args.file, ndmin=2)
 
-            if len(col_idxs) == 1 and float(tokens[col_idxs[0]]) == args.remove_facets:
-                continue
+    if facets.size == 0:
+        parser.error(f"{args.file} does not contain any facets.")
 
-            poly = vertexes_to_poly(transformer, tokens[:9], args.keep_z)
-            polys.append(poly)
+    if len(col_idxs) == 1 and args.remove_facets is not None:
+        facets = facets[facets[:, col_idxs[0]] != args.remove_facets]
 
-            for i, col in enumerate(col_idxs):
-                values[value_keys[i]].append(
-                    replace_with(0, replace_with_zero, tokens[col])
-                )
+    polys = vertexes_to_polys(transformer, facets[:, :9], args.keep_z)
 
     if args.value_file is not None:
-        values = {k: [] for k in value_keys}  # Re-initialize and empty.
-        with open(args.value_file, "r") as vf:
-            for line in vf:
-                tokens = line.split()
-                for i, col in enumerate(col_idxs):
-                    values[value_keys[i]].append(
-                        replace_with(0, replace_with_zero, tokens[col])
-                    )
-
-        if len(values[value_keys[0]]) != len(polys):
+        value_rows = np.loadtxt(args.value_file, ndmin=2)
+
+        if len(value_rows) != len(polys):
             parser.error(
                 "The provided value_file has a different number of entries "
                 "than the provided .tri file with facet vertices."
             )
+    else:
+        value_rows = facets
+
+    values = {
+        k: replace_with(0, replace_with_zero, value_rows[:, col])
+        for k, col in zip(value_keys, col_idxs)
+    }
 
     values["geometry"] = polys
     gdf = geopandas.GeoDataFrame(values, crs=t_crs)
@@ -287,29 +288,45 @@ def main():
     return
 
 
-def vertexes_to_poly(transformer, tokens: list, z=True):
-    in_m = list(map(lambda x: float(x) * 1000, tokens))
+def vertexes_to_poly(transformer, tokens: list, z=True) -> Polygon:
+    # The three vertexes are transformed together by vertexes_to_polys().
+    return vertexes_to_polys(transformer, [tokens[:9]], z)[0]
 
-    v1 = transformer.transform(in_m[0], in_m[1], in_m[2])
-    v2 = transformer.transform(in_m[3], in_m[4], in_m[5])
-    v3 = transformer.transform(in_m[6], in_m[7], in_m[8])
 
-    if z:
-        poly = Polygon([v1, v2, v3])
-    else:
-        poly = Polygon([v1[:-1], v2[:-1], v3[:-1]])
+def vertexes_to_polys(transformer, vertexes: np.ndarray, z=True):
+    """
+    Returns a numpy array of triangular Polygons, one for each row of
+    *vertexes*, whose nine columns are the coordinates of the three vertexes
+    of a facet in kilometers (x1 y1 z1 x2 y2 z2 x3 y3 z3).
+
+    All of the vertexes are transformed with a single call to *transformer*.
+    """
+    in_m = np.asarray(vertexes, dtype=float).reshape(-1, 3) * 1000
+    coords = np.column_stack(transformer.transform(in_m[:, 0], in_m[:, 1], in_m[:, 2]))
+
+    if not z:
+        coords = coords[:, :2]
 
-    if poly.area == 0:
-        raise ValueError(f"This polygon has zero area: {poly}")
+    polys = shapely.polygons(coords.reshape(-1, 3, coords.shape[1]))
 
-    return poly
+    zero_area = shapely.area(polys) == 0
+    if zero_area.any():
+        raise ValueError(f"This polygon has zero area: {polys[zero_area][0]}")
+
+    return polys
 
 
 def replace_with(replacement_val, replacement_check, value):
-    if float(value) == replacement_check:
-        return replacement_val
-    else:
-        return float(value)
+    """
+    Returns *value* as a float, or *replacement_val* if it is equal to
+    *replacement_check*.  If *value* is an array, each element is checked,
+    and a numpy array is returned.
+    """
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 0:
+        return replacement_val if value == replacement_check else float(value)
+
+    return np.where(value == replacement_check, replacement_val, value)
 
 
 # def get_wkt_value(transformer, tokens: list):
@@ -98,8 +98,9 @@ class DataSimulator:
         """
         is_arraylike = hasattr(bd, "__iter__")
 
-        d1 = self.det1_model(np.column_stack((bd, weh)))
-        d2 = self.det2_model(np.column_stack((bd, weh)))
+        stacked = np.column_stack((bd, weh))
+        d1 = self.det1_model(stacked)
+        d2 = self.det2_model(stacked)
 
         if poisson:
             d1, d2 = self.rng.poisson(lam=(d1, d2))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""This module has tests for the accrual functions."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import unittest
+from collections import Counter
+
+import geopandas as gp
+import shapely
+from shapely.geometry import box, LineString
+
+from vipersci.carto import accrual
+
+
+class TestAccumulate(unittest.TestCase):
+    def setUp(self):
+        self.areas = gp.GeoDataFrame(
+            {
+                "category": ["a", "b", "a", "c"],
+                "geometry": [
+                    box(0, 0, 10, 10),
+                    box(10, 0, 20, 10),
+                    box(20, 0, 30, 10),
+                    box(0, 10, 30, 20),
+                ],
+            }
+        )
+
+    def test_accumulate(self):
+        path = LineString([(5, 5), (25, 5)])
+        c = accrual.accumulate(path, self.areas)
+        self.assertIsInstance(c, Counter)
+        self.assertAlmostEqual(c["a"], 10)
+        self.assertAlmostEqual(c["b"], 10)
+        self.assertAlmostEqual(c["c"], 0)
+        self.assertAlmostEqual(sum(c.values()), path.length)
+        self.assertFalse(shapely.is_prepared(path))
+
+        shapely.prepare(path)
+        self.assertEqual(accrual.accumulate(path, self.areas), c)
+
+    def test_categorical(self):
+        path = LineString([(5, 5), (25, 5)])
+        expected = accrual.accumulate(path, self.areas)
+        self.areas["category"] = self.areas["category"].astype("category")
+        self.assertEqual(accrual.accumulate(path, self.areas), expected)
+
+    def test_counter(self):
+        path = LineString([(5, 5), (15, 5)])
+        c = accrual.accumulate(path, self.areas, counter={"a": 1, "d": 2})
+        self.assertAlmostEqual(c["a"], 6)
+        self.assertAlmostEqual(c["b"], 5)
+        self.assertAlmostEqual(c["d"], 2)
+
+    def test_bounds(self):
+        path = LineString([(5, 5), (25, 5)])
+        b = self.areas.total_bounds
+        self.assertEqual(
+            accrual.accumulate(path, self.areas, bounds=b),
+            accrual.accumulate(path, self.areas),
+        )
+        self.assertRaises(
+            ValueError, accrual.accumulate, path, self.areas, bounds=(0, 0, 20, 20)
+        )
+
+    def test_overlapping(self):
+        # Each area that the path crosses accrues the length within it, even
+        # if that length was already accrued by another area.
+        path = LineString([(5, 5), (15, 5)])
+        areas = gp.GeoDataFrame(
+            {
+                "category": ["a", "b"],
+                "geometry": [box(0, 0, 20, 10), box(10, 0, 20, 10)],
+            }
+        )
+        c = accrual.accumulate(path, areas)
+        self.assertAlmostEqual(c["a"], 10)
+        self.assertAlmostEqual(c["b"], 5)
+
+    def test_outside(self):
+        path = LineString([(5, 5), (35, 5)])
+        self.assertRaises(ValueError, accrual.accumulate, path, self.areas)
+
+        path = LineString([(5, 5), (5, -1)])
+        self.assertRaises(ValueError, accrual.accumulate, path, self.areas)
@@ -46,6 +46,49 @@ class TestPalette(unittest.TestCase):
         self.assertIsInstance(p2.cmap, mpl.colors.ListedColormap)
         self.assertIsInstance(p2.norm, mpl.colors.BoundaryNorm)
 
+    def test_init_copies_cmap(self):
+        cmap = mpl.colormaps["viridis"]
+        over = cmap.get_over()
+        p = cf.Palette(cmap, 0, 100, extend="neither")
+        self.assertIsNot(p.cmap, cmap)
+        np.testing.assert_array_equal(cmap.get_over(), over)
+        self.assertEqual(cmap.colorbar_extend, False)
+        self.assertEqual(p.cmap.get_over()[3], 0)
+
+    def test_from_preset(self):
+        p = cf.Palette.from_preset("slope_disc")
+        self.assertEqual(p.label, cf.presets["slope_disc"]["label"])
+        self.assertEqual(p.bounded, cf.presets["slope_disc"]["bounded"])
+
+        # Each Palette is new, so changing one doesn't change later ones.
+        p.cmap.set_bad("red")
+        p.to_gdal_colormap()
+        q = cf.Palette.from_preset("slope_disc")
+        self.assertIsNot(p, q)
+        self.assertIsNot(p.cmap, q.cmap)
+        self.assertNotEqual(tuple(q.cmap.get_bad()[:3]), (1.0, 0.0, 0.0))
+        self.assertEqual(q._gdal_colormaps, {})
+
+        v = cf.Palette.from_preset("verve_slope")
+        self.assertEqual(v.cmap.name, "VERVE_stoplight")
+        self.assertEqual(cf.presets["verve_slope"]["cmap"], "")
+
+        self.assertRaises(KeyError, cf.Palette.from_preset, "foo")
+
+    def test_apply(self):
+        arr = np.array([[-5, 0, 1, 3], [7.5, 15, 20, 25], [12, 19.9, np.nan, 4]])
+        for p in (
+            cf.Palette("viridis", 0, 20),
+            cf.Palette("RdPu", 0, 20, bounded=[0, 3, 5, 10, 15, 20], extend="max"),
+            cf.Palette("Blues_r", 0, 20, bounded=[0, 0.5, 17, 20], extend="both"),
+        ):
+            with self.subTest(bounded=p.bounded):
+                rgba = p.apply(arr)
+                self.assertEqual(rgba.dtype, np.uint8)
+                np.testing.assert_array_equal(
+                    rgba, p.cmap(p.norm(np.ma.masked_invalid(arr)), bytes=True)
+                )
+
     def test_init_error(self):
         self.assertRaises(ValueError, cf.Palette, "viridis", 0, 100, extend="foo")
 
@@ -318,6 +361,20 @@ class TestPalette(unittest.TestCase):
 100.001 253 231 36 0""",
         )
 
+        self.assertIs(t, p.to_gdal_colormap())
+        self.assertNotEqual(t, p.to_gdal_colormap(epsilon=0.01))
+        p.label = "Other Units"
+        self.assertTrue(p.to_gdal_colormap().startswith("# Color table for Other"))
+
+        # Changing the colormap or the norm in place isn't missed by the cache.
+        t = p.to_gdal_colormap()
+        p.cmap.set_over("red")
+        over = p.to_gdal_colormap()
+        self.assertIsNot(t, over)
+        self.assertTrue(over.endswith("100.001 255 0 0 255"))
+        p.norm = cf.mpl.colors.Normalize(vmin=0, vmax=50)
+        self.assertIsNot(over, p.to_gdal_colormap())
+
 
 class TestFunctions(unittest.TestCase):
     def test_arg_parser(self):
@@ -356,3 +413,6 @@ class TestFunctions(unittest.TestCase):
     def test_verve_stoplight(self):
         vs = cf.verve_stoplight()
         self.assertIsInstance(vs, mpl.colors.ListedColormap)
+        self.assertEqual(vs.N, 101)
+        self.assertEqual(vs(0, bytes=True), (139, 219, 135, 255))
+        self.assertEqual(vs(1.0, bytes=True), (254, 14, 2, 255))
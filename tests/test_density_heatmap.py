@@ -39,15 +39,12 @@ class TestDensityHeatmap(unittest.TestCase):
     def test_density_heatmap_3x3_uniform(self):
         self.uniform_density_heatmap_runner((3, 3), processes=1)
 
-    @unittest.skip("for speedup")
     def test_density_heatmap_30x50_uniform(self):
         self.uniform_density_heatmap_runner((30, 50), processes=8)
 
-    @unittest.skip("for speedup")
     def test_density_heatmap_31x17_uniform(self):
         self.uniform_density_heatmap_runner((31, 17), processes=8)
 
-    @unittest.skip("for speedup")
     def test_density_heatmap_100x100_uniform(self):
         self.uniform_density_heatmap_runner((100, 100), processes=8)
 
@@ -202,6 +199,7 @@ class TestDensityHeatmap(unittest.TestCase):
             processes=processes,
         )
 
+        hits = hm._cached_sample_pixels.cache_info().hits
         affine_transform_2, frequencies_2, out_avg_2, _ = hm.generate_density_heatmap(
             x.ravel(),
             y.ravel(),
@@ -216,6 +214,7 @@ class TestDensityHeatmap(unittest.TestCase):
         self.assertTrue(np.array_equal(frequencies, frequencies_2))
         self.assertTrue(np.array_equal(out_avg, out_avg_2))
         self.assertEqual(affine_transform, affine_transform_2)
+        self.assertEqual(hm._cached_sample_pixels.cache_info().hits, hits + 1)
 
     def test_single_location(
         self,
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""This module has tests for the dice_buffer functions."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import unittest
+from unittest.mock import patch
+
+import geopandas as gp
+
+from shapely.geometry import (
+    box,
+    GeometryCollection,
+    LineString,
+    MultiPolygon,
+    Point,
+)
+
+from vipersci.carto import dice_buffer as db
+
+
+class TestClean(unittest.TestCase):
+    def test_clean(self):
+        gc = GeometryCollection(
+            [
+                box(0, 0, 1, 1),
+                LineString([(5, 5), (6, 6)]),
+                Point(7, 7),
+                MultiPolygon([box(2, 0, 3, 1), box(4, 0, 5, 1)]),
+            ]
+        )
+        c = db.clean(gc)
+        self.assertIsInstance(c, MultiPolygon)
+        self.assertEqual(len(c.geoms), 3)
+        self.assertAlmostEqual(c.area, 3)
+
+    def test_passthrough(self):
+        b = box(0, 0, 1, 1)
+        self.assertIs(db.clean(b), b)
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        # Deliberately not in ISR order.
+        self.df = gp.GeoDataFrame(
+            {"category": ["Dry", "Shallow", "Surficial", "Deep"]},
+            geometry=[
+                box(3, 0, 4, 1),
+                box(1, 0, 2, 1),
+                box(0, 0, 1, 1),
+                box(2, 0, 3, 1),
+            ],
+        )
+
+    @patch("vipersci.carto.dice_buffer.gp.GeoSeries.to_file", autospec=True)
+    @patch("vipersci.carto.dice_buffer.gp.read_file")
+    def test_erode(self, m_read, m_to_file):
+        m_read.return_value = self.df
+        pa_ret_val = db.arg_parser().parse_args(
+            ["-b", "-0.1", "-o", "out.gpkg", "in.gpkg"]
+        )
+        with patch("vipersci.carto.dice_buffer.arg_parser") as parser:
+            parser.return_value.parse_args.return_value = pa_ret_val
+            db.main()
+
+        cleaned = m_to_file.call_args[0][0]
+        self.assertEqual(list(cleaned.index), ["Dry", "Shallow", "Surficial", "Deep"])
+        self.assertAlmostEqual(cleaned.loc["Surficial"].area, 0.64)
+        for cat in ("Shallow", "Deep", "Dry"):
+            with self.subTest(category=cat):
+                self.assertAlmostEqual(cleaned.loc[cat].area, 0.8)
+                overlap = cleaned.loc[cat].intersection(cleaned.loc["Surficial"])
+                self.assertAlmostEqual(overlap.area, 0)
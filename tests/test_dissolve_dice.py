@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""This module has tests for the dissolve_dice functions."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import unittest
+from unittest.mock import patch
+
+import geopandas as gp
+from shapely.geometry import Polygon
+
+from vipersci.carto import dissolve_dice as dd
+
+
+def square(x, y, z):
+    return Polygon([(x, y, z), (x + 1, y, z), (x + 1, y + 1, z), (x, y + 1, z)])
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.df = gp.GeoDataFrame(
+            {"Depth (m)": ["0", "0.3", "0.7", "5", "0.2"]},
+            geometry=[
+                square(0, 0, 1),
+                square(1, 0, 2),
+                square(2, 0, 0),
+                square(3, 0, 0),
+                square(0, 1, 0),
+            ],
+        )
+
+    @patch("vipersci.carto.dissolve_dice.gp.GeoDataFrame.to_file", autospec=True)
+    @patch("vipersci.carto.dissolve_dice.gp.read_file")
+    def test_main(self, m_read, m_to_file):
+        m_read.return_value = self.df
+        pa_ret_val = dd.arg_parser().parse_args(["-o", "out.gpkg", "in.gpkg"])
+        with patch("vipersci.carto.dissolve_dice.arg_parser") as parser:
+            parser.return_value.parse_args.return_value = pa_ret_val
+            dd.main()
+
+        m_read.assert_called_once_with("in.gpkg")
+        dissolved = m_to_file.call_args[0][0]
+        self.assertEqual(
+            sorted(dissolved.index), ["Deep", "Dry", "Shallow", "Surficial"]
+        )
+        self.assertFalse(dissolved.has_z.any())
+        self.assertAlmostEqual(dissolved.loc["Shallow"].geometry.area, 2)
+        self.assertAlmostEqual(dissolved.loc["Surficial"].geometry.area, 1)
@@ -24,7 +24,7 @@
 # top level of this library.
 import numpy as np
 import rasterio
-from vipersci.carto.dotmap import generate_dotmap
+from vipersci.carto.dotmap import draw_circles, generate_dotmap
 
 
 def test_single_point():
@@ -62,6 +62,40 @@ def test_single_point_padded():
     )
 
 
+def test_fractional_gsd():
+    """
+    Test that a ground sample distance that isn't exact in floating point
+    still yields a grid that covers the bounds.
+    """
+    transform, raster = generate_dotmap(
+        [0, 0.4], [0, 0.1], [1, 2], radius=0.1, ground_sample_distance=0.1, padding=0
+    )
+
+    assert raster.shape == (3, 6)
+    assert np.allclose(
+        (-0.1, -0.1, 0.5, 0.2),
+        rasterio.windows.bounds(
+            rasterio.windows.Window(0, 0, raster.shape[1], raster.shape[0]), transform
+        ),
+    )
+    assert np.count_nonzero(raster == 1) == 4
+    assert np.count_nonzero(raster == 2) == 4
+
+
+def test_dtype():
+    transform, raster = generate_dotmap(
+        [0, 1],
+        [0, 1],
+        [1, 2],
+        radius=1,
+        ground_sample_distance=1,
+        nodata=255,
+        dtype=np.uint8,
+    )
+    assert raster.dtype == np.uint8
+    assert np.array_equal(raster, [[255, 2, 2], [1, 2, 2], [1, 1, 255]])
+
+
 def test_2_overlapping_points():
     """
     Test creating a raster with 2 overlapping data points
@@ -129,3 +163,39 @@ def test_horizontal_line():
             [-1] + [1] * 10 + [-1],
         ],
     )
+
+
+def test_draw_circles_chunks():
+    """
+    Test that drawing circles in chunks gives the same result, including
+    overwriting, as drawing them all at once.
+    """
+    rng = np.random.default_rng(42)
+    x_arr = rng.uniform(1, 9, 50)
+    y_arr = rng.uniform(1, 9, 50)
+    value_arr = np.arange(50, dtype=np.float32)
+
+    whole = np.full((40, 40), -1, dtype=np.float32)
+    draw_circles(whole, 0, 10, 0.25, x_arr, y_arr, value_arr, 1)
+
+    chunked = np.full((40, 40), -1, dtype=np.float32)
+    draw_circles(chunked, 0, 10, 0.25, x_arr, y_arr, value_arr, 1, chunk_size=7)
+
+    assert np.array_equal(whole, chunked)
+
+    # One point at a time, no pixel is repeated in an assignment.
+    single = np.full((40, 40), -1, dtype=np.float32)
+    draw_circles(single, 0, 10, 0.25, x_arr, y_arr, value_arr, 1, chunk_size=1)
+    assert np.array_equal(whole, single)
+    # The last point is drawn over everything else.
+    row = int((10 - y_arr[-1]) / 0.25)
+    col = int(x_arr[-1] / 0.25)
+    assert whole[row, col] == 49
+
+
+def test_draw_circles_clipped():
+    output = np.zeros((3, 3))
+    x = np.array([0.5, 2.9])
+    y = np.array([2.5, 0.1])
+    draw_circles(output, 0, 3, 1, x, y, np.array([1, 2]), 1.5)
+    assert np.array_equal(output, [[1, 1, 0], [1, 1, 2], [0, 2, 2]])
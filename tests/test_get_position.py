@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""This module has tests for the get_position functions."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from vipersci.carto import get_position as gpos
+
+
+class TestGetPositionAndPose(unittest.TestCase):
+    @patch("vipersci.carto.get_position.requests.Session")
+    def test_get_position_and_pose(self, m_session):
+        def get(url, params, **kwargs):
+            m_response = Mock()
+            t = params["event_time"]
+            m_response.json.return_value = {
+                "event_seconds": t,
+                "location": [t + 1, t + 2],
+                "yaw": t + 3,
+            }
+            return m_response
+
+        session = m_session.return_value.__enter__.return_value
+        session.get.side_effect = get
+
+        times = list(range(0, 100, 10))
+        tpp = gpos.get_position_and_pose(times, "http://example.com", max_workers=4)
+        self.assertEqual(tpp.dtype, gpos.TPP_DTYPE)
+        self.assertEqual(tpp.tolist(), [(t, t + 1, t + 2, t + 3) for t in times])
+        self.assertEqual(session.get.call_count, len(times))
+        m_session.assert_called_once()
+
+    def test_get_position_and_pose_session(self):
+        session = Mock()
+        session.get.return_value.json.return_value = {
+            "event_seconds": 1,
+            "location": [2, 3],
+            "yaw": 4,
+        }
+        tpp = gpos.get_position_and_pose([1, 1], "http://example.com", session=session)
+        self.assertEqual(tpp.tolist(), [(1, 2, 3, 4), (1, 2, 3, 4)])
+        self.assertEqual(session.get.call_count, 2)
+        session.close.assert_not_called()
+
+    @patch("vipersci.carto.get_position.requests.get")
+    def test_get_position_and_pose_range(self, m_get):
+        for rj, truth in (
+            (
+                {
+                    "event_seconds": [10, 11, 12],
+                    "location": [[1, 2], [3, 4], [5, 6]],
+                    "yaw": [0.1, 0.2, 0.3],
+                },
+                [(10, 1, 2, 0.1), (11, 3, 4, 0.2), (12, 5, 6, 0.3)],
+            ),
+            (
+                {"event_seconds": 10, "location": [1, 2], "yaw": 0.1},
+                [(10, 1, 2, 0.1)],
+            ),
+        ):
+            with self.subTest(rj=rj):
+                m_get.return_value.json.return_value = rj
+                tpp = gpos.get_position_and_pose_range(0, 20, "http://example.com")
+                self.assertEqual(tpp.dtype, gpos.TPP_DTYPE)
+                self.assertEqual(tpp.tolist(), truth)
+
+                session = Mock()
+                session.get.return_value.json.return_value = rj
+                tpp = gpos.get_position_and_pose_range(
+                    0, 20, "http://example.com", session=session
+                )
+                session.get.assert_called_once()
+                self.assertEqual(tpp.tolist(), truth)
+
+
+class TestWriteCSV(unittest.TestCase):
+    def test_write_csv(self):
+        tpp = np.array(
+            [
+                (1700000000.0, 1.5, 2.25, 0.1),
+                (1700000000.5, 3.0, 4.0, -1.0),
+            ],
+            dtype=gpos.TPP_DTYPE,
+        )
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "out.csv"
+            gpos.write_csv(path, tpp)
+            with open(path, newline="") as f:
+                text = f.read()
+
+        self.assertEqual(
+            text,
+            "UTC datetime,x,y,yaw\r\n"
+            "2023-11-14T22:13:20+00:00,1.5,2.25,0.1\r\n"
+            "2023-11-14T22:13:20.500000+00:00,3.0,4.0,-1.0\r\n",
+        )
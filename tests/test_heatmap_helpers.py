@@ -23,7 +23,9 @@
 # The AUTHORS file and the LICENSE file are at the
 # top level of this library.
 
+import tempfile
 import unittest
+from pathlib import Path
 
 import numpy as np
 import rasterio
@@ -34,6 +36,11 @@ from vipersci.carto import bounds, heatmap
 
 
 class TestBounds(unittest.TestCase):
+    def test_compute_bounds(self):
+        b = bounds.compute_bounds(np.array([3, 1, 2]), np.array([-1, 5, 0]))
+        self.assertIsInstance(b, BoundingBox)
+        self.assertEqual(b, (1, -1, 3, 5))
+
     def test_simple(self):
         initial_bounds = (0, 0, 10, 10)
         expected_bounds = initial_bounds
@@ -58,6 +65,34 @@ class TestBounds(unittest.TestCase):
         out_bounds = bounds.pad_grid_align_bounds(*initial_bounds, 2)
         self.assertEqual(out_bounds, expected_bounds)
 
+    def test_as_ndarray(self):
+        a = np.array([1.0, 2.0])
+        self.assertIs(heatmap.as_ndarray(a), a)
+        self.assertIs(heatmap.as_ndarray(a, np.float64), a)
+
+        i = heatmap.as_ndarray([1, 2])
+        self.assertEqual(i.dtype, np.dtype(int))
+        f = heatmap.as_ndarray([1, 2], np.float64)
+        self.assertEqual(f.dtype, np.float64)
+        np.testing.assert_array_equal(f, a)
+
+    def test_disk_sums(self):
+        t = rasterio.transform.from_origin(0, 4, 1, 1)
+        x = np.array([1.0, 1.5, 3.9])
+        y = np.array([3.0, 2.5, 0.1])
+        counts, totals = heatmap.disk_sums((4, 4), t, x, y, np.array([1, 2, 4]), 0.8)
+        np.testing.assert_array_equal(
+            counts, [[1, 1, 0, 0], [1, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 1]]
+        )
+        np.testing.assert_array_equal(
+            totals, [[1, 1, 0, 0], [1, 3, 0, 0], [0, 0, 0, 0], [0, 0, 0, 4]]
+        )
+
+        # Chunking doesn't change the sums.
+        chunked = heatmap.disk_sums((4, 4), t, x, y, np.array([1, 2, 4]), 0.8, 1)
+        np.testing.assert_array_equal(chunked[0], counts)
+        np.testing.assert_array_equal(chunked[1], totals)
+
     def test_buffered_mask_full(self):
         points = shapely.geometry.LineString([(0, 0), (1, 0), (1, 1), (0, 1)])
         gsd = 1
@@ -65,3 +100,98 @@ class TestBounds(unittest.TestCase):
         t = rasterio.transform.from_origin(b.left, b.top, gsd, gsd)
         mask = heatmap.buffered_mask(points, t, buffer=1)
         self.assertTrue(np.array_equal(np.full((3, 3), False), mask))
+
+    def test_buffered_mask_round(self):
+        points = shapely.geometry.LineString([(0, 0), (4, 3), (8, 0), (2, 0.5)])
+        gsd = 0.5
+        b = BoundingBox(*bounds.pad_grid_align_bounds(0, 0, 8, 3, gsd, 3))
+        t = rasterio.transform.from_origin(b.left, b.top, gsd, gsd)
+        mask = heatmap.buffered_mask(points, t, buffer=1.2)
+
+        # A pixel is unmasked when its center is within the buffer of the line.
+        def expected(geom, shape):
+            cols, rows = np.meshgrid(np.arange(shape[1]), np.arange(shape[0]))
+            centers = shapely.points(*(t * (cols + 0.5, rows + 0.5)))
+            return shapely.distance(geom, centers) > 1.2
+
+        np.testing.assert_array_equal(mask, expected(points, mask.shape))
+
+        # The parts of a MultiLineString, like an intersection of a traverse
+        # with sample bounds gives, aren't joined.
+        for parts in (
+            shapely.MultiLineString([[(0, 0), (3, 0)], [(8, 3), (5, 1)]]),
+            shapely.MultiLineString([[(0, 0), (8, 0)], [(8, 2.5), (0, 2.5)]]),
+        ):
+            multi = heatmap.buffered_mask(parts, t, buffer=1.2)
+            np.testing.assert_array_equal(multi, expected(parts, multi.shape))
+
+        touched = heatmap.buffered_mask(points, t, buffer=1.2, all_touched=True)
+        self.assertEqual(touched.shape, mask.shape)
+        self.assertTrue(np.all(touched <= mask))
+        self.assertLess(touched.sum(), mask.sum())
+
+    def test_write_geotiff_rasterio(self):
+        t = rasterio.transform.from_origin(0, 600, 1, 1)
+        avg = np.arange(600 * 700, dtype=np.float32).reshape((600, 700))
+        counts = np.arange(600 * 700, dtype=np.uintc).reshape((600, 700)) % 7
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "test.tif"
+            heatmap.write_geotiff_rasterio(
+                path, rasterio.crs.CRS.from_epsg(32633), t, avg, avg * 2
+            )
+            with rasterio.open(path) as r:
+                self.assertEqual(r.profile["blockxsize"], 512)
+                self.assertTrue(r.profile["tiled"])
+                np.testing.assert_array_equal(r.read(1), avg)
+                np.testing.assert_array_equal(r.read(2), avg * 2)
+
+            heatmap.write_geotiff_rasterio(
+                path,
+                rasterio.crs.CRS.from_epsg(32633),
+                t,
+                counts,
+                profile={"tiled": False},
+            )
+            with rasterio.open(path) as r:
+                self.assertFalse(r.profile["tiled"])
+                np.testing.assert_array_equal(r.read(1), counts)
+
+    def test_get_gdal_info_extent(self):
+        t = rasterio.transform.from_origin(500000, 4000000, 10, 10)
+        utm = rasterio.crs.CRS.from_epsg(32633)
+        wgs84 = rasterio.crs.CRS.from_epsg(4326)
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "test.tif"
+            info = heatmap.write_geotiff_rasterio(
+                path, utm, t, np.ones((2, 3)), source_crs=wgs84
+            )
+            self.assertIs(
+                heatmap._transformer(utm.to_wkt(), wgs84.to_wkt()),
+                heatmap._transformer(utm.to_wkt(), wgs84.to_wkt()),
+            )
+
+        # EPSG:4326 is latitude, longitude in its authority's axis order.
+        lat, lon = info["extent"]["coordinates"][0][1]
+        self.assertAlmostEqual(lat, 36.1447, places=4)
+        self.assertAlmostEqual(lon, 15.0, places=4)
+        self.assertEqual(len(info["extent"]["coordinates"][0]), 5)
+
+    def test_write_geotiff_rasterio_compression(self):
+        t = rasterio.transform.from_origin(0, 20, 1, 1)
+        crs = rasterio.crs.CRS.from_epsg(32633)
+        counts = np.arange(400, dtype=np.uintc).reshape((20, 20))
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "test.tif"
+            for data, predictor in ((counts, "2"), (counts / 3, None)):
+                heatmap.write_geotiff_rasterio(path, crs, t, data)
+                with rasterio.open(path) as r:
+                    self.assertEqual(r.compression.name, "deflate")
+                    tags = r.tags(ns="IMAGE_STRUCTURE")
+                    self.assertEqual(tags.get("PREDICTOR"), predictor)
+                    np.testing.assert_array_equal(r.read(1), data)
+
+            heatmap.write_geotiff_rasterio(
+                path, crs, t, counts, profile={"predictor": 1}
+            )
+            with rasterio.open(path) as r:
+                self.assertIsNone(r.tags(ns="IMAGE_STRUCTURE").get("PREDICTOR"))
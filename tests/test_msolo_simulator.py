@@ -23,15 +23,33 @@
 # The AUTHORS file and the LICENSE file are at the
 # top level of this library.
 import argparse
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 import numpy as np
+import rasterio
+from rasterio.io import MemoryFile
 
 from vipersci.carto import msolo_simulator as ms
 
 
+def dataset(memfile, arr, transform=None):
+    if transform is None:
+        transform = rasterio.transform.from_origin(0, arr.shape[0], 1, 1)
+    with memfile.open(
+        driver="GTiff",
+        height=arr.shape[0],
+        width=arr.shape[1],
+        count=1,
+        dtype=arr.dtype,
+        transform=transform,
+    ) as d:
+        d.write(arr, 1)
+    return memfile.open()
+
+
 class TestParser(unittest.TestCase):
     def test_parser(self):
         parser = ms.arg_parser()
@@ -45,18 +63,87 @@ class TestLocationSimulator(unittest.TestCase):
         mock_rasterio_data.transform.called_once()
         mock_rasterio_data.read.called_once_with(1)
 
-    @patch(
-        "vipersci.carto.msolo_simulator.rasterio.transform.rowcol", return_value=(0, 0)
-    )
     @patch(
         "vipersci.carto.msolo_simulator.LocationSimulator._init_map",
-        return_value=("xform", "array"),
+        return_value=(rasterio.Affine.identity(), "array"),
     )
-    def test_call(self, mock_init_map, mock_rowcol):
+    def test_call(self, mock_init_map):
         simulator = ms.LocationSimulator(Path("dummy/bd.tif"), Path("dummy/temp.tif"))
-        simulator.bd_arr = np.array([[2.5, 2.5], [2.5, 2.5]])
-        simulator.temp_arr = np.array([[264, 264], [264, 264]])
+        with MemoryFile() as bd_file, MemoryFile() as temp_file:
+            simulator.bd_data = dataset(bd_file, np.array([[2.5, 2.5], [2.5, 2.5]]))
+            simulator.temp_data = dataset(temp_file, np.array([[264, 264], [264, 264]]))
+
+            m20, m40 = simulator(np.array([0, 0]))
+            self.assertAlmostEqual(m20, 2.5991128778755347e-08)
+            self.assertAlmostEqual(m40, 1.3732678498607127e-10)
+
+    def test_call_many(self):
+        bd = np.array([[1.5, 2.5, 0.5], [2.0, 1.0, 3.0]], dtype=np.float32)
+        temp = np.array([[100, 264, 200], [150, 250, 90]], dtype=np.float32)
+        t = rasterio.transform.from_origin(0, 2, 1, 1)
+        with MemoryFile() as bd_file, MemoryFile() as temp_file:
+            with patch(
+                "vipersci.carto.msolo_simulator.LocationSimulator._init_map",
+                side_effect=[
+                    (t, dataset(bd_file, bd, t)),
+                    (t, dataset(temp_file, temp, t)),
+                ],
+            ):
+                simulator = ms.LocationSimulator(
+                    Path("dummy/bd.tif"), Path("dummy/temp.tif")
+                )
+
+            xy = np.array([[1.5, 2.5, 1.2], [0.5, 1.5, 0.1]])
+            m20, m40 = simulator(xy)
+            for i, (row, col) in enumerate(((1, 1), (0, 2), (1, 1))):
+                one_m20, one_m40 = simulator(xy[:, i])
+                self.assertEqual(one_m20, m20[i])
+                self.assertEqual(one_m40, m40[i])
+                self.assertEqual(m20[i], ms.msolo.mass20(temp[row, col], bd[row, col]))
+
+            self.assertRaises(IndexError, simulator, np.array([3.5, 0.5]))
+
+            m20, m40 = simulator(np.empty((2, 0)))
+            self.assertEqual(m20.shape, (0,))
+            self.assertEqual(m40.shape, (0,))
+
+            with simulator:
+                pass
+            self.assertTrue(simulator.bd_data.closed)
+            self.assertTrue(simulator.temp_data.closed)
+
+
+class TestMain(unittest.TestCase):
+    @patch("vipersci.carto.msolo_simulator.LocationSimulator")
+    def test_traverse(self, mock_simulator):
+        mock_simulator.return_value.__enter__.return_value = mock_simulator.return_value
+        mock_simulator.return_value.side_effect = lambda coords: (
+            coords[0] * 2,
+            coords[1] * 3,
+        )
+        with tempfile.TemporaryDirectory() as d:
+            trav = Path(d) / "traverse.csv"
+            out = Path(d) / "out.csv"
+            trav.write_text("x,y,name\n1,2,a\n3.5,4.0,\n")
+            with patch(
+                "sys.argv",
+                [
+                    "msolo_simulator",
+                    "-b",
+                    "bd.tif",
+                    "--temperature",
+                    "temp.tif",
+                    "-o",
+                    str(out),
+                    "-t",
+                    str(trav),
+                ],
+            ):
+                ms.main()
 
-        m20, m40 = simulator(np.array([0, 0]))
-        self.assertAlmostEqual(m20, 2.5991128778755347e-08)
-        self.assertAlmostEqual(m40, 1.3732678498607127e-10)
+            mock_simulator.return_value.assert_called_once()
+            mock_simulator.return_value.__exit__.assert_called_once()
+            self.assertEqual(
+                out.read_bytes(),
+                b"x,y,name,m20,m40\r\n1,2,a,2.0,6.0\r\n3.5,4.0,,7.0,12.0\r\n",
+            )
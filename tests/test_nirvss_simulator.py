@@ -23,11 +23,13 @@
 # The AUTHORS file and the LICENSE file are at the
 # top level of this library.
 import argparse
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 import numpy as np
+import rasterio
 
 from vipersci.carto import nirvss_simulator as ns
 
@@ -45,14 +47,11 @@ class TestLocationSimulator(unittest.TestCase):
         mock_rasterio_data.transform.called_once()
         mock_rasterio_data.read.called_once_with(1)
 
-    @patch(
-        "vipersci.carto.nirvss_simulator.rasterio.transform.rowcol", return_value=(0, 0)
-    )
     @patch(
         "vipersci.carto.nirvss_simulator.LocationSimulator._init_map",
-        return_value=("xform", "array"),
+        return_value=(rasterio.Affine.identity(), "array"),
     )
-    def test_call(self, mock_init_map, mock_rowcol):
+    def test_call(self, mock_init_map):
         simulator = ns.LocationSimulator(
             Path("dummy/bd.tif"), Path("dummy/insl.tif"), Path("dummy/temp.tif")
         )
@@ -63,3 +62,95 @@ class TestLocationSimulator(unittest.TestCase):
         h2o, oh = simulator(np.array([0, 0]))
         self.assertAlmostEqual(h2o, 4.371779725275095e-05)
         self.assertAlmostEqual(oh, 0.009899494936611665)
+
+
+class TestMain(unittest.TestCase):
+    @patch("vipersci.carto.nirvss_simulator.LocationSimulator")
+    def test_traverse(self, mock_simulator):
+        mock_simulator.return_value.side_effect = lambda coords: (
+            coords[0] * 2,
+            coords[1] * 3,
+        )
+        with tempfile.TemporaryDirectory() as d:
+            trav = Path(d) / "traverse.csv"
+            out = Path(d) / "out.csv"
+            trav.write_text("x,y,name\n1,2,a\n3.5,4.0,\n")
+            argv = ["nirvss_simulator", "-b", "bd.tif", "-i", "insl.tif"]
+            argv += ["--temperature", "temp.tif", "-o", str(out), "-t", str(trav)]
+            with patch("sys.argv", argv):
+                ns.main()
+
+            mock_simulator.return_value.assert_called_once()
+            self.assertEqual(
+                out.read_bytes(),
+                b"x,y,name,bd_h2o,bd_oh\r\n1,2,a,2.0,6.0\r\n3.5,4.0,,7.0,12.0\r\n",
+            )
+
+    def test_maps(self):
+        rng = np.random.default_rng(3)
+        maps = {
+            "bd.tif": rng.uniform(0, 3, (300, 270)).astype(np.float32),
+            "insl.tif": rng.uniform(150, 400, (300, 270)).astype(np.float32),
+            "temp.tif": rng.uniform(40, 300, (300, 270)).astype(np.float32),
+        }
+        with tempfile.TemporaryDirectory() as d:
+            for name, arr in maps.items():
+                with rasterio.open(
+                    Path(d) / name,
+                    "w",
+                    driver="GTiff",
+                    height=arr.shape[0],
+                    width=arr.shape[1],
+                    count=1,
+                    dtype=arr.dtype,
+                    transform=rasterio.transform.from_origin(0, 300, 1, 1),
+                ) as dst:
+                    dst.write(arr, 1)
+
+            argv = ["nirvss_simulator", "-b", str(Path(d) / "bd.tif")]
+            argv += ["-i", str(Path(d) / "insl.tif")]
+            argv += ["--temperature", str(Path(d) / "temp.tif")]
+            argv += ["-o", str(Path(d) / "out")]
+            with patch("sys.argv", argv):
+                ns.main()
+
+            expected = {
+                "out_h2o.tif": ns.nirvss.band_depth_H2O(
+                    maps["temp.tif"], maps["bd.tif"]
+                ),
+                "out_oh.tif": ns.nirvss.band_depth_OH(maps["insl.tif"]),
+            }
+            for name, arr in expected.items():
+                with rasterio.open(Path(d) / name) as r:
+                    self.assertEqual(r.block_shapes, [(256, 256)])
+                    np.testing.assert_array_equal(r.read(1), arr.astype(np.float32))
+
+
+class TestLocationSimulatorMaps(unittest.TestCase):
+    def test_call_transforms(self):
+        arr = np.arange(12, dtype=np.float32).reshape((3, 4)) + 240
+        t = rasterio.transform.from_origin(0, 3, 1, 1)
+        shifted = rasterio.transform.from_origin(1, 3, 1, 1)
+        for insl_t in (t, shifted):
+            with patch(
+                "vipersci.carto.nirvss_simulator.LocationSimulator._init_map",
+                side_effect=[(t, arr / 100), (insl_t, arr), (t, arr)],
+            ):
+                simulator = ns.LocationSimulator(
+                    Path("dummy/bd.tif"), Path("dummy/insl.tif"), Path("dummy/temp.tif")
+                )
+
+            x = np.array([1.5, 2.5, 3.5])
+            y = np.array([0.5, 2.5, 1.5])
+            h2o, oh = simulator(np.stack((x, y)))
+            rows, cols = rasterio.transform.rowcol(t, x, y)
+            insl_rows, insl_cols = rasterio.transform.rowcol(insl_t, x, y)
+            np.testing.assert_array_equal(
+                h2o,
+                ns.nirvss.band_depth_H2O(
+                    arr[rows, cols].astype(float), (arr / 100)[rows, cols].astype(float)
+                ),
+            )
+            np.testing.assert_array_equal(
+                oh, ns.nirvss.band_depth_OH(arr[insl_rows, insl_cols].astype(float))
+            )
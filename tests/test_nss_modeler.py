@@ -24,11 +24,16 @@
 # top level of this library.
 
 import argparse
+import tempfile
 import unittest
+from functools import partial
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
 import numpy as np
+import rasterio
+from rasterio.io import MemoryFile
+from rasterio.windows import Window
 
 from vipersci.carto import nss_modeler as nm
 
@@ -44,6 +49,7 @@ class TestWrite(unittest.TestCase):
         self,
     ):
         m = mock_open()
+        m.return_value.shape = (1, 2)
         arr = np.array([1, 2])
         path = Path("dummy")
         ending = "end.tif"
@@ -51,6 +57,113 @@ class TestWrite(unittest.TestCase):
         with patch("vipersci.carto.nss_modeler.rasterio.open", m):
             nm.write_tif(path, ending, arr, kwds)
 
-        m.assert_called_once_with(path.with_name(path.name + ending), "w", **kwds)
+        m.assert_called_once_with(
+            path.with_name(path.name + ending),
+            "w",
+            foo="bar",
+            tiled=True,
+            blockxsize=256,
+            blockysize=256,
+            compress="deflate",
+            predictor=2,
+        )
         handle = m()
         handle.write.assert_called_once_with(arr, 1)
+
+    def test_write_tif_file(self):
+        arr = np.linspace(0, 1, 600 * 520).reshape((600, 520))
+        kwds = {
+            "driver": "GTiff",
+            "height": 600,
+            "width": 520,
+            "count": 1,
+            "dtype": "float32",
+            "transform": rasterio.transform.from_origin(0, 600, 1, 1),
+        }
+        with tempfile.TemporaryDirectory() as d:
+            p = nm.write_tif(Path(d) / "test", "_end.tif", arr, kwds)
+            self.assertEqual(p, Path(d) / "test_end.tif")
+            with rasterio.open(p) as r:
+                self.assertEqual(r.block_shapes, [(256, 256)])
+                self.assertEqual(r.compression.name, "deflate")
+                self.assertEqual(r.tags(ns="IMAGE_STRUCTURE")["PREDICTOR"], "3")
+                self.assertEqual(r.overviews(1), [2])
+                np.testing.assert_array_equal(r.read(1), arr.astype(np.float32))
+
+
+class TestBlockWindows(unittest.TestCase):
+    def test_block_windows(self):
+        arr = np.zeros((5, 7), dtype=np.float32)
+        with MemoryFile() as memfile:
+            with memfile.open(
+                driver="GTiff",
+                height=5,
+                width=7,
+                count=1,
+                dtype=arr.dtype,
+                transform=rasterio.transform.from_origin(0, 5, 1, 1),
+            ) as d:
+                d.write(arr, 1)
+            with memfile.open() as d:
+                windows = list(nm.block_windows(d, size=3))
+
+        self.assertEqual(
+            windows,
+            [
+                Window(0, 0, 3, 3),
+                Window(3, 0, 3, 3),
+                Window(6, 0, 1, 3),
+                Window(0, 3, 3, 2),
+                Window(3, 3, 3, 2),
+                Window(6, 3, 1, 2),
+            ],
+        )
+
+
+class TestMain(unittest.TestCase):
+    @patch("vipersci.carto.nss_modeler.nss.DataModeler")
+    def test_main(self, mock_modeler):
+        mock_modeler.return_value.side_effect = lambda d1, d2: (
+            (d1 * 2.0).filled(-1),
+            (d2 * 3.0).filled(-1),
+            (d1 + d2).filled(-1),
+        )
+        det1 = np.arange(35, dtype=np.float32).reshape((5, 7))
+        det2 = det1 + 100
+        t = rasterio.transform.from_origin(0, 5, 1, 1)
+        with tempfile.TemporaryDirectory() as d:
+            for name, arr in (("det1.tif", det1), ("det2.tif", det2)):
+                with rasterio.open(
+                    Path(d) / name,
+                    "w",
+                    driver="GTiff",
+                    height=5,
+                    width=7,
+                    count=1,
+                    dtype=arr.dtype,
+                    transform=t,
+                    nodata=0,
+                ) as dst:
+                    dst.write(arr, 1)
+
+            argv = ["nss_modeler", "--bd_mod", "bd.csv", "--weh_mod", "weh.csv"]
+            argv += ["--det1", str(Path(d) / "det1.tif")]
+            argv += ["--det2", str(Path(d) / "det2.tif")]
+            argv += ["-o", str(Path(d) / "out_")]
+            with patch("sys.argv", argv), patch(
+                "vipersci.carto.nss_modeler.block_windows",
+                side_effect=partial(nm.block_windows, size=3),
+            ):
+                nm.main()
+
+            self.assertEqual(mock_modeler.return_value.call_count, 6)
+            expected = {
+                "bd.tif": np.where(det1 == 0, -1, det1 * 2),
+                "weh.tif": det2 * 3,
+                "uweh.tif": np.where(det1 == 0, -1, det1 + det2),
+            }
+            for ending, arr in expected.items():
+                with rasterio.open(Path(d) / f"out_{ending}") as r:
+                    self.assertEqual(r.nodata, -1)
+                    self.assertEqual(r.dtypes[0], "float64")
+                    np.testing.assert_array_equal(r.read(1), arr)
@@ -24,11 +24,13 @@
 # top level of this library.
 
 import argparse
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 import numpy as np
+import rasterio
 
 from vipersci.carto import nss_simulator as ns
 
@@ -57,14 +59,11 @@ class TestLocationSimulator(unittest.TestCase):
         mock_rasterio_data.transform.called_once()
         mock_rasterio_data.read.called_once_with(1)
 
-    @patch(
-        "vipersci.carto.nss_simulator.rasterio.transform.rowcol", return_value=(0, 0)
-    )
     @patch(
         "vipersci.carto.nss_simulator.LocationSimulator._init_map",
-        return_value=("xform", "array"),
+        return_value=(rasterio.Affine.identity(), "array"),
     )
-    def test_call(self, mock_init_map, mock_rowcol):
+    def test_call(self, mock_init_map):
         with patch("vipersci.nss.read_csv", return_value=(self.arr, self.rc, self.cc)):
             simulator = ns.LocationSimulator(
                 Path("dummy/bd.tif"),
@@ -78,3 +77,31 @@ class TestLocationSimulator(unittest.TestCase):
             d1, d2 = simulator(np.array([0, 0]))
             self.assertAlmostEqual(d1, 110)
             self.assertAlmostEqual(d2, 110)
+
+
+class TestMain(unittest.TestCase):
+    @patch("vipersci.carto.nss_simulator.LocationSimulator")
+    def test_traverse(self, mock_simulator):
+        def simulate(coords, poisson=False):
+            if poisson:
+                return np.array([1, 2]), np.array([3, 4])
+            return coords[0] * 2, coords[1] * 3
+
+        mock_simulator.return_value.side_effect = simulate
+        with tempfile.TemporaryDirectory() as d:
+            trav = Path(d) / "traverse.csv"
+            out = Path(d) / "out.csv"
+            trav.write_text("x,y,name\n1,2,a\n3.5,4.0,\n")
+            argv = ["nss_simulator", "-b", "bd.tif", "--det1", "d1.csv"]
+            argv += ["--det2", "d2.csv", "-w", "weh.tif", "-o", str(out)]
+            argv += ["-t", str(trav)]
+            with patch("sys.argv", argv):
+                ns.main()
+
+            self.assertEqual(mock_simulator.return_value.call_count, 2)
+            self.assertEqual(
+                out.read_bytes(),
+                b"x,y,name,det1,det2,det1pois,det2pois\r\n"
+                b"1,2,a,2.0,6.0,1,3\r\n"
+                b"3.5,4.0,,7.0,12.0,2,4\r\n",
+            )
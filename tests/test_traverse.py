@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""This module has tests for the traverse functions."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import rasterio
+
+from vipersci.carto import traverse
+
+
+class TestFunctions(unittest.TestCase):
+    def test_rowcols(self):
+        t = rasterio.transform.from_origin(-100.25, 3000.5, 0.5, 0.75)
+        shifted = rasterio.transform.from_origin(-101, 3000, 0.25, 0.25)
+        rng = np.random.default_rng(7)
+        x = rng.uniform(-100, 0, 50)
+        y = rng.uniform(2950, 3000, 50)
+
+        found = traverse.rowcols((t, shifted, t), x, y)
+        self.assertEqual(len(found), 3)
+        for (rows, cols), transform in zip(found, (t, shifted, t)):
+            expected_rows, expected_cols = rasterio.transform.rowcol(transform, x, y)
+            np.testing.assert_array_equal(rows, expected_rows)
+            np.testing.assert_array_equal(cols, expected_cols)
+
+        # The rows and columns of a shared transform are only found once.
+        self.assertIs(found[0], found[2])
+
+        ((row, col),) = traverse.rowcols((t,), x[0], y[0])
+        self.assertEqual((row, col), rasterio.transform.rowcol(t, x[0], y[0]))
+
+    def test_read_write_traverse(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "traverse.csv"
+            path.write_text("x,y,name\n1,2.50,a\n3.5,4.0,\n")
+            df = traverse.read_traverse(path)
+            self.assertEqual(df["y"].tolist(), ["2.50", "4.0"])
+            self.assertEqual(df["name"].tolist(), ["a", ""])
+
+            df["value"] = [0.5, 2.0]
+            traverse.write_traverse(df, path)
+            self.assertEqual(
+                path.read_bytes(),
+                b"x,y,name,value\r\n1,2.50,a,0.5\r\n3.5,4.0,,2.0\r\n",
+            )
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""This module has tests for the traverse_interpolator module."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from vipersci.carto import traverse_interpolator as ti
+
+
+def feature(name, start, end, coords):
+    return {
+        "type": "Feature",
+        "properties": {"name": name, "start_time": start, "end_time": end},
+        "geometry": {"type": "LineString", "coordinates": coords},
+    }
+
+
+class TestFunctions(unittest.TestCase):
+    def test_interval_count(self):
+        self.assertEqual(ti.interval_count(5, 8, 1), 3)
+        self.assertEqual(ti.interval_count(0, 5, 2), 2)
+
+
+class TestMain(unittest.TestCase):
+    def test_main(self):
+        features = [
+            feature("Driving", 0, 5, [[1, 0], [11, 0]]),
+            feature("Stop", 5, 8, [[11, 0], [11, 0.5]]),
+            feature("Driving", 8, 10, [[11, 0], [11, 4]]),
+        ]
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "traverse.json"
+            out = Path(d) / "out.csv"
+            path.write_text(
+                json.dumps({"type": "FeatureCollection", "features": features})
+            )
+            with patch(
+                "sys.argv", ["traverse_interpolator", "-o", str(out), str(path)]
+            ):
+                ti.main()
+
+            self.assertEqual(
+                out.read_text().splitlines(),
+                [
+                    "time,x,y",
+                    "0.0,1.0,0.0",
+                    "1.0,3.0,0.0",
+                    "2.0,5.0,0.0",
+                    "3.0,7.0,0.0",
+                    "4.0,9.0,0.0",
+                    "5.0,11.0,0.0",
+                    "6.0,11.0,0.0",
+                    "7.0,11.0,0.0",
+                    "8.0,11.0,0.0",
+                    "9.0,11.0,2.0",
+                ],
+            )
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""This module has tests for the tri2gpkg functions."""
+
+# Copyright 2026, United States Government as represented by the
+# Administrator of the National Aeronautics and Space Administration.
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Reuse is permitted under the terms of the license.
+# The AUTHORS file and the LICENSE file are at the
+# top level of this library.
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import geopandas
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
+
+from vipersci.carto import tri2gpkg
+
+# Two facets on the surface of the Moon, near the south pole, in km.
+facets = np.array(
+    [
+        [0.0, 1.0, -1737.4, 1.0, 1.0, -1737.4, 0.0, 2.0, -1737.4, -1.0],
+        [1.0, 1.0, -1737.4, 1.0, 2.0, -1737.4, 0.0, 2.0, -1737.4, 0.5],
+    ]
+)
+
+
+class TestFunctions(unittest.TestCase):
+    def setUp(self):
+        self.transformer = Transformer.from_crs(
+            CRS("+proj=cart +a=1737400 +b=1737400"), CRS(tri2gpkg.sites["spole"])
+        )
+
+    def test_vertexes_to_poly(self):
+        tokens = list(map(str, facets[0]))
+        poly = tri2gpkg.vertexes_to_poly(self.transformer, tokens)
+        expected = shapely.Polygon(
+            [
+                self.transformer.transform(*(facets[0, i : i + 3] * 1000))
+                for i in (0, 3, 6)
+            ]
+        )
+        self.assertTrue(shapely.equals_exact(poly, expected, 0))
+
+    def test_vertexes_to_polys(self):
+        polys = tri2gpkg.vertexes_to_polys(self.transformer, facets[:, :9])
+        self.assertEqual(len(polys), 2)
+
+        for poly, facet in zip(polys, facets):
+            expected = tri2gpkg.vertexes_to_poly(
+                self.transformer, list(map(str, facet[:9]))
+            )
+            self.assertTrue(shapely.equals_exact(poly, expected, 0))
+            self.assertTrue(poly.has_z)
+
+        flat = tri2gpkg.vertexes_to_polys(self.transformer, facets[:, :9], z=False)
+        self.assertFalse(flat[0].has_z)
+
+        line = facets[:1, :9].copy()
+        line[0, 6:9] = line[0, 3:6]
+        self.assertRaises(
+            ValueError, tri2gpkg.vertexes_to_polys, self.transformer, line
+        )
+
+    def test_replace_with(self):
+        self.assertEqual(tri2gpkg.replace_with(0, -1, "-1"), 0)
+        self.assertEqual(tri2gpkg.replace_with(0, -1, "2.5"), 2.5)
+        np.testing.assert_array_equal(
+            tri2gpkg.replace_with(0, -1, facets[:, 9]), [0, 0.5]
+        )
+
+
+class TestMain(unittest.TestCase):
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "test.tri10"
+            out = Path(d) / "test.gpkg"
+            np.savetxt(path, facets)
+
+            with patch(
+                "sys.argv",
+                [
+                    "tri2gpkg",
+                    "-s",
+                    "spole",
+                    "--keep_all_facets",
+                    "-o",
+                    str(out),
+                    str(path),
+                ],
+            ):
+                tri2gpkg.main()
+
+            gdf = geopandas.read_file(out)
+            self.assertEqual(len(gdf), 2)
+            np.testing.assert_array_equal(gdf["Depth (m)"], [0, 0.5])
+
+            with patch(
+                "sys.argv",
+                [
+                    "tri2gpkg",
+                    "-s",
+                    "spole",
+                    "--remove_facets",
+                    "0.5",
+                    "-o",
+                    str(out),
+                    str(path),
+                ],
+            ):
+                tri2gpkg.main()
+
+            gdf = geopandas.read_file(out)
+            self.assertEqual(len(gdf), 1)
+
+    def test_main_empty(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "test.tri10"
+            path.write_text("# No facets here.\n")
+            with patch("sys.argv", ["tri2gpkg", "-s", "spole", str(path)]), patch(
+                "sys.stderr"
+            ):
+                self.assertRaises(SystemExit, tri2gpkg.main)
+
+            self.assertFalse(path.with_suffix(".gpkg").exists())